@@ -1,23 +1,172 @@
 import os
 import sys
+import multiprocessing
+import numpy as np
 import pandas as pd
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, replace
 from datetime import datetime
 
-from modules.logging_config import setup_logging
+from modules.logging_config import setup_logging, get_log_queue, setup_worker_logging
 from modules.config import load_config
 from modules.auth import (
     initial_authentication,
     generate_new_token,
     get_auth_token
 )
-from modules.data_fetcher import fetch_historical_data_with_cache, initialize_db, fetch_tokens_from_file
+from modules.data_fetcher import (
+    fetch_historical_data_with_cache,
+    initialize_db,
+    fetch_tokens_from_file,
+    HistoricalDataRequest,
+    API_CONCURRENCY
+)
 from modules.indicators import calculate_indicators
 from modules.signals import generate_signals
 from modules.simulator import simulate_trades
 from modules.exceptions import AuthenticationError, TokenError
 from modules.reporting import save_results, save_summary
 
+MAX_WORKERS = 8
+
+# Read-only settings of a simulation worker process, set once by init_worker
+_worker_config = None
+_worker_request = None
+_worker_run_timestamp = None
+
+def init_worker(config, base_request, run_timestamp, log_queue):
+    """
+    Initialize a simulation worker process.
+
+    The configuration and base request are handed over once per process instead of
+    being pickled with every token, and logging is routed to the main process.
+    """
+    global _worker_config, _worker_request, _worker_run_timestamp
+    _worker_config = config
+    _worker_request = base_request
+    _worker_run_timestamp = run_timestamp
+    setup_worker_logging(log_queue)
+
+def fetch_token_data(obj, name, token, base_request):
+    """
+    Fetch the historical data for a single stock.
+
+    Parameters:
+        obj (SmartConnect): Authenticated SmartConnect object.
+        name (str): Name of the stock.
+        token (str): Symbol token of the stock.
+        base_request (HistoricalDataRequest): Historical data request shared by all tokens.
+
+    Returns:
+        pd.DataFrame or None: Candles for the stock, or None if no data was available.
+    """
+    logger = logging.getLogger("trading_bot")
+    logger.info("Fetching data for stock: %s (token: %s)", name, token)
+
+    # Build the request for this token without touching the shared config
+    raw_data = fetch_historical_data_with_cache(obj, replace(base_request, symboltoken=token))
+    if raw_data is None or raw_data.empty:
+        logger.warning("No historical data available for stock: %s. Skipping.", name)
+        return None
+    return raw_data
+
+def process_token(name, token, raw_data):
+    """
+    Generate signals and simulate trading for a single stock.
+
+    Runs in a worker process set up by init_worker, which provides the configuration.
+
+    Parameters:
+        name (str): Name of the stock.
+        token (str): Symbol token of the stock.
+        raw_data (pd.DataFrame): Historical candles of the stock.
+
+    Returns:
+        dict: Performance metrics for the summary.
+    """
+    logger = logging.getLogger("trading_bot")
+    INDICATOR_CONFIG = _worker_config.get("INDICATOR_CONFIG")
+    TRADE_CONFIG = _worker_config.get("TRADE_CONFIG")
+    CHARGES = _worker_config.get("CHARGES")
+
+    logger.info("Starting simulation for stock: %s (token: %s)", name, token)
+    request = replace(_worker_request, symboltoken=token)
+
+    # Calculate indicators
+    data = calculate_indicators(raw_data, INDICATOR_CONFIG)
+
+    # Generate signals
+    data, _, _ = generate_signals(data, INDICATOR_CONFIG)
+    
+    # Simulate trading
+    trades, missed_signals, daily_summary, final_summary = simulate_trades(
+        data,
+        initial_capital=TRADE_CONFIG['INITIAL_CAPITAL'],
+        trade_allocation=TRADE_CONFIG['TRADE_ALLOCATION'],
+        leverage=TRADE_CONFIG.get('LEVERAGE', 1),
+        target_profit_percentage=TRADE_CONFIG['TARGET_PROFIT_PERCENTAGE'],
+        atr_multiplier=TRADE_CONFIG.get('ATR_MULTIPLIER', 1),
+        charges_config=CHARGES,
+        indicator_config=INDICATOR_CONFIG,
+        historical_data=asdict(request)
+    )
+
+    # Prepare signals data for reporting
+    buy_signal = data['Buy_Signal'].to_numpy(dtype=bool)
+    signal_rows = np.flatnonzero(buy_signal | data['Sell_Signal'].to_numpy(dtype=bool))
+    report_columns = ['timestamp', 'close', 'volume', 'RSI', 'MACD', 'Signal', 'VWAP', 'ATR']
+    signal_columns = data.columns.get_indexer(report_columns)
+    # get_indexer marks a missing column with -1, which iloc would read as the last column
+    if (signal_columns < 0).any():
+        missing = [column for column, position in zip(report_columns, signal_columns) if position < 0]
+        raise KeyError(f"Columns {missing} are missing from the data of {name}.")
+    # Positional take of only the reported rows and columns, already in report order
+    signals_data = data.iloc[signal_rows, signal_columns]
+
+    # Label each selected row from the same positions instead of looking rows up by index label
+    signals_data.insert(2, 'Signal Type', np.where(buy_signal[signal_rows], 'Buy', 'Sell'))
+
+    # Save trading results
+    #save_results(trades, missed_signals, daily_summary, final_summary, signals_data, name, "results", _worker_run_timestamp)
+
+    # Calculate win rate
+    completed_trades = trades[trades['Type'].isin(['Sell', 'Square Off'])]
+    wins = len(completed_trades[completed_trades['Profit/Loss'] > 0])
+    total_trades = len(completed_trades)
+    win_rate = (wins / total_trades) * 100 if total_trades > 0 else 0
+
+    # Performance metrics for the summary
+    return {
+        "Stock Name": name,
+        "Profit/Loss": final_summary['Total Profit/Loss'],
+        "Win Rate (%)": round(win_rate, 2)
+    }
+
+def run_all(obj, token_data, config, base_request, run_timestamp):
+    """
+    Fetch and simulate every token, returning the summary rows in token order.
+
+    Fetching runs in threads, since it mostly waits on getCandleData and the API semaphore
+    keeps it within the rate limit. The CPU-bound simulations run in separate processes,
+    each picking up a token as soon as its data has arrived.
+    """
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, API_CONCURRENCY)) as fetchers, \
+            ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                # Spawned workers do not inherit locks held by the fetcher and logging threads
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(config, base_request, run_timestamp, get_log_queue())
+            ) as simulators:
+        fetched = fetchers.map(lambda item: (*item, fetch_token_data(obj, *item, base_request)), token_data)
+        futures = [
+            simulators.submit(process_token, name, token, raw_data)
+            for name, token, raw_data in fetched
+            if raw_data is not None
+        ]
+        return [future.result() for future in futures]
+
 def main():
     # Set up logging
     logger = setup_logging()
@@ -30,7 +179,6 @@ def main():
     config = load_config()
     INDICATOR_CONFIG = config.get("INDICATOR_CONFIG")
     TRADE_CONFIG = config.get("TRADE_CONFIG")
-    CHARGES = config.get("CHARGES")
     HISTORICAL_DATA = config.get("HISTORICAL_DATA")
     FROM_DATE = HISTORICAL_DATA['fromdate']
     TO_DATE = HISTORICAL_DATA['todate']
@@ -51,13 +199,13 @@ def main():
             totp_secret=os.getenv("SMARTAPI_TOTP_SECRET")
         )
     except AuthenticationError as auth_err:
-        logger.critical(f"Authentication failed: {auth_err}")
+        logger.critical("Authentication failed: %s", auth_err)
         sys.exit(1)
     except TokenError as token_err:
-        logger.critical(f"Token handling failed: {token_err}")
+        logger.critical("Token handling failed: %s", token_err)
         sys.exit(1)
     except Exception as e:
-        logger.critical(f"An unexpected error occurred during authentication: {e}")
+        logger.critical("An unexpected error occurred during authentication: %s", e)
         sys.exit(1)
 
     # Fetch names and tokens from instruments.xlsx
@@ -71,71 +219,21 @@ def main():
     buy_rsi_threshold_high = INDICATOR_CONFIG.get('BUY_RSI_THRESHOLD_HIGH')
     sell_rsi_threshold = INDICATOR_CONFIG.get('SELL_RSI_THRESHOLD')
     
-    # Initialize a list to collect summary data
-    summary_data = []
-
-    # Process each token one by one
-    for name, token in token_data:  # Unpack name and token properly
-        logger.info(f"Starting simulation for stock: {name} (token: {token})")
-
-        # Update config dynamically for the token
-        config["HISTORICAL_DATA"]["symboltoken"] = token
-
-        # Fetch historical data
-        initialize_db()
-        raw_data = fetch_historical_data_with_cache(obj, config["HISTORICAL_DATA"])
-        if raw_data is None:
-            logger.warning(f"No historical data available for stock: {name}. Skipping.")
-            continue
-
-        # Calculate indicators
-        data = calculate_indicators(raw_data, INDICATOR_CONFIG)
-
-        # Generate signals
-        data, _, _ = generate_signals(data, INDICATOR_CONFIG)
-        
-        # Simulate trading
-        trades, missed_signals, daily_summary, final_summary = simulate_trades(
-            data,
-            initial_capital=TRADE_CONFIG['INITIAL_CAPITAL'],
-            trade_allocation=TRADE_CONFIG['TRADE_ALLOCATION'],
-            leverage=TRADE_CONFIG.get('LEVERAGE', 1),
-            target_profit_percentage=TRADE_CONFIG['TARGET_PROFIT_PERCENTAGE'],
-            atr_multiplier=TRADE_CONFIG.get('ATR_MULTIPLIER', 1),
-            charges_config=CHARGES,
-            indicator_config=INDICATOR_CONFIG,
-            historical_data=HISTORICAL_DATA
-        )
-
-        # Prepare signals data for reporting
-        signals_data = data.loc[data['Buy_Signal'] | data['Sell_Signal'], [
-            'timestamp', 'close', 'RSI', 'MACD', 'Signal', 'VWAP', 'ATR', 'volume'
-        ]].copy()
-
-        signals_data['Signal Type'] = signals_data.apply(
-            lambda row: 'Buy' if row.name in data[data['Buy_Signal']].index else 'Sell',
-            axis=1
-        )
-        signals_data = signals_data[['timestamp', 'close', 'Signal Type', 'volume', 'RSI', 'MACD', 'Signal', 'VWAP', 'ATR']]
+    # Make sure the historical data cache exists before processing any token
+    initialize_db()
 
-        # Save trading results
-        #save_results(trades, missed_signals, daily_summary, final_summary, signals_data, name, output_dir="results")
+    # Parse the historical data settings once; each token only swaps in its symbol token
+    base_request = HistoricalDataRequest.from_config(HISTORICAL_DATA)
 
-        # Calculate win rate
-        completed_trades = trades[trades['Type'].isin(['Sell', 'Square Off'])]
-        wins = len(completed_trades[completed_trades['Profit/Loss'] > 0])
-        total_trades = len(completed_trades)
-        win_rate = (wins / total_trades) * 100 if total_trades > 0 else 0
+    # Every report of this run goes into the results directory under one run timestamp
+    os.makedirs("results", exist_ok=True)
+    run_timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
 
-        # Append performance metrics to summary data
-        summary_data.append({
-            "Stock Name": name,
-            "Profit/Loss": final_summary['Total Profit/Loss'],
-            "Win Rate (%)": round(win_rate, 2)
-        })
+    # Fetch the tokens concurrently and simulate them in worker processes
+    summary_data = run_all(obj, token_data, config, base_request, run_timestamp)
 
     # Save the summary to an Excel file with dynamic RSI settings
-    summary_file = os.path.join("results", f"summary_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.xlsx")
+    summary_file = os.path.join("results", f"summary_{run_timestamp}.xlsx")
     save_summary(
         summary_data=summary_data,
         summary_file=summary_file,
@@ -152,11 +250,11 @@ if __name__ == "__main__":
     try:
         main()
     except AuthenticationError as auth_err:
-        logging.getLogger("trading_bot").critical(f"Authentication failed: {auth_err}")
+        logging.getLogger("trading_bot").critical("Authentication failed: %s", auth_err)
         sys.exit(1)
     except TokenError as token_err:
-        logging.getLogger("trading_bot").critical(f"Token handling failed: {token_err}")
+        logging.getLogger("trading_bot").critical("Token handling failed: %s", token_err)
         sys.exit(1)
     except Exception as e:
-        logging.getLogger("trading_bot").critical(f"An unexpected error occurred: {e}")
+        logging.getLogger("trading_bot").critical("An unexpected error occurred: %s", e)
         sys.exit(1)
@@ -2,7 +2,7 @@
 
 import os
 import json
-import tempfile
+from functools import lru_cache
 import pyotp
 from SmartApi.smartConnect import SmartConnect
 import logging
@@ -10,21 +10,40 @@ from modules.exceptions import AuthenticationError, TokenError
 
 def clean_token(token):
     """Remove 'Bearer ' prefix from the token if present."""
-    bearer_prefix = "Bearer "
-    if token.startswith(bearer_prefix):
-        return token[len(bearer_prefix):]
-    return token
+    return token.removeprefix("Bearer ")
+
+@lru_cache(maxsize=4)
+def _totp(secret):
+    """Return the TOTP generator for a secret, decoding the secret only once."""
+    return pyotp.TOTP(secret)
 
 def save_tokens(tokens, token_file="tokens.json"):
-    """Save authentication tokens to a JSON file atomically."""
+    """
+    Save authentication tokens to a JSON file atomically.
+
+    Nothing is written if the file already holds the same tokens. The data is only
+    fsynced before the rename when the DURABLE_TOKENS environment variable is set.
+    """
     try:
-        with tempfile.NamedTemporaryFile('w', delete=False, dir='.') as tf:
-            json.dump(tokens, tf)
-            temp_name = tf.name
+        try:
+            with open(token_file, "r") as tf:
+                if json.load(tf) == tokens:
+                    return
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        temp_name = f"{token_file}.tmp"
+        fd = os.open(temp_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.write(fd, json.dumps(tokens).encode())
+            if os.getenv("DURABLE_TOKENS", "").lower() in ("1", "true", "yes"):
+                os.fsync(fd)
+        finally:
+            os.close(fd)
         os.replace(temp_name, token_file)
         logging.getLogger("trading_bot").info("Tokens saved successfully.")
     except Exception as e:
-        logging.getLogger("trading_bot").error(f"Failed to save tokens: {e}")
+        logging.getLogger("trading_bot").error("Failed to save tokens: %s", e)
         raise TokenError("Unable to save tokens.")
 
 def load_tokens(token_file="tokens.json"):
@@ -34,16 +53,16 @@ def load_tokens(token_file="tokens.json"):
             tokens = json.load(tf)
         return tokens
     except FileNotFoundError:
-        logging.getLogger("trading_bot").info(f"{token_file} not found.")
+        logging.getLogger("trading_bot").info("%s not found.", token_file)
         return None
     except json.JSONDecodeError:
-        logging.getLogger("trading_bot").error(f"{token_file} is corrupted.")
+        logging.getLogger("trading_bot").error("%s is corrupted.", token_file)
         return None
 
 def initial_authentication(obj, client_id, pin, totp_secret):
     """Perform initial authentication to obtain tokens."""
     try:
-        totp = pyotp.TOTP(totp_secret)
+        totp = _totp(totp_secret)
         otp = totp.now()
         logging.getLogger("trading_bot").info("Generated OTP successfully.")
 
@@ -61,10 +80,10 @@ def initial_authentication(obj, client_id, pin, totp_secret):
             return auth_token
         else:
             error_message = session_data.get('message', 'Unknown error during authentication.')
-            logging.getLogger("trading_bot").error(f"Login failed: {error_message}")
+            logging.getLogger("trading_bot").error("Login failed: %s", error_message)
             raise AuthenticationError(f"Login failed: {error_message}")
     except Exception as e:
-        logging.getLogger("trading_bot").error(f"Login failed: {e}")
+        logging.getLogger("trading_bot").error("Login failed: %s", e)
         raise AuthenticationError("Initial authentication failed.")
 
 def generate_new_token(obj, refresh_token):
@@ -84,7 +103,7 @@ def generate_new_token(obj, refresh_token):
             return auth_token
         else:
             error_message = session_data.get('message', 'Unknown error during token refresh.')
-            logging.getLogger("trading_bot").warning(f"Token generation failed: {error_message}")
+            logging.getLogger("trading_bot").warning("Token generation failed: %s", error_message)
             return initial_authentication(
                 obj,
                 client_id=os.getenv("client_id"),
@@ -92,7 +111,7 @@ def generate_new_token(obj, refresh_token):
                 totp_secret=os.getenv("totp_secret")
             )
     except Exception as e:
-        logging.getLogger("trading_bot").error(f"Error generating new token: {e}")
+        logging.getLogger("trading_bot").error("Error generating new token: %s", e)
         return initial_authentication(
             obj,
             client_id=os.getenv("client_id"),
@@ -123,5 +142,5 @@ def get_auth_token(obj, client_id, pin, totp_secret):
             logging.getLogger("trading_bot").warning("Access Token invalid. Attempting to generate new token...")
             return generate_new_token(obj, refresh_token)
     except Exception as e:
-        logging.getLogger("trading_bot").error(f"Failed to validate token: {e}")
+        logging.getLogger("trading_bot").error("Failed to validate token: %s", e)
         return generate_new_token(obj, refresh_token)
@@ -1,34 +1,41 @@
 # modules/config.py
 
-import json
 import sys
 import logging
+import fastjsonschema
+import orjson
+
+# Compiled once at import time; fastjsonschema generates a Python function for the schema
+_validate_config = fastjsonschema.compile({
+    "type": "object",
+    "required": ["HISTORICAL_DATA"],
+    "properties": {
+        "HISTORICAL_DATA": {
+            "type": "object",
+            "required": ["exchange", "symboltoken", "interval", "fromdate", "todate"]
+        }
+    }
+})
 
 def load_config(config_path="config.json"):
     """Load and validate configuration from a JSON file."""
     try:
-        with open(config_path, "r") as config_file:
-            config = json.load(config_file)
-        
-        # Validate 'HISTORICAL_DATA' section
-        if "HISTORICAL_DATA" not in config:
-            raise KeyError("Missing 'HISTORICAL_DATA' section in config.json.")
+        with open(config_path, "rb") as config_file:
+            config = orjson.loads(config_file.read())
         
-        HISTORICAL_DATA_keys = ["exchange", "symboltoken", "interval", "fromdate", "todate"]
-        for key in HISTORICAL_DATA_keys:
-            if key not in config["HISTORICAL_DATA"]:
-                raise KeyError(f"Missing '{key}' in 'HISTORICAL_DATA' section.")
+        # Validate the 'HISTORICAL_DATA' section and its required keys
+        _validate_config(config)
         
         # Validate other sections as needed (INDICATOR_CONFIG, CHARGES, TRADE_CONFIG)
         required_sections = ["INDICATOR_CONFIG", "CHARGES", "TRADE_CONFIG"]
         for section in required_sections:
             if section not in config:
-                logging.warning(f"Missing '{section}' section in config.json. Using empty dictionary.")
+                logging.warning("Missing '%s' section in config.json. Using empty dictionary.", section)
                 config[section] = {}
         
         logging.info("Configuration loaded successfully from config.json.")
         return config
     except Exception as e:
-        logging.critical(f"Failed to load configuration: {e}")
+        logging.critical("Failed to load configuration: %s", e)
         sys.exit(1)
         
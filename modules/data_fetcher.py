@@ -1,14 +1,61 @@
 from datetime import datetime
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from itertools import islice
+import atexit
+import csv
 import logging
 import pandas as pd
 import sqlite3
+import threading
+import time
+from pathlib import Path
+from modules.exceptions import RateLimitError
+
+try:
+    import pyarrow  # noqa: F401
+    DTYPE_BACKEND = "pyarrow"
+except ImportError:
+    DTYPE_BACKEND = "numpy_nullable"
 
 DB_FILE = "historical_data.db"
 
+# getCandleData allows 3 requests per second. The semaphore only caps how many calls are in
+# flight; _wait_for_api_slot spaces the start of each call so the rate itself is kept.
+API_CONCURRENCY = 3
+API_REQUESTS_PER_SECOND = 3
+_api_semaphore = threading.Semaphore(API_CONCURRENCY)
+_api_rate_lock = threading.Lock()
+_api_next_call_at = 0.0
+
+# Rate-limited replies are retried after a growing pause before the fetch is given up
+API_RATE_LIMIT_RETRIES = 3
+API_RATE_LIMIT_BACKOFF = 1.0  # Seconds before the first retry, doubled after each one
+
+@dataclass(frozen=True, slots=True)
+class HistoricalDataRequest:
+    """Parameters of a getCandleData request, parsed once from the HISTORICAL_DATA config section."""
+    exchange: str
+    symboltoken: str
+    interval: str
+    fromdate: str
+    todate: str
+
+    @classmethod
+    def from_config(cls, historical_data_config):
+        """Build a request from the HISTORICAL_DATA section, ignoring any extra keys."""
+        missing = [field.name for field in fields(cls) if field.name not in historical_data_config]
+        if missing:
+            raise ValueError(f"Missing required keys {missing} in the HISTORICAL_DATA section.")
+        return cls(**{field.name: historical_data_config[field.name] for field in fields(cls)})
+
 def fetch_tokens_from_file(file_path="data/instruments.xlsx", num_files_to_load=None):
     """
     Reads the top N instrument names and tokens from the specified Excel file.
 
+    The two columns are cached next to the workbook as a CSV file (e.g. data/instruments.csv),
+    which is read with the csv module alone for as long as it is not older than the workbook.
+
     Args:
         file_path (str): Path to the Excel file.
         num_files_to_load (int or None): Number of top rows to read. If None, fetch all rows.
@@ -17,96 +64,278 @@ def fetch_tokens_from_file(file_path="data/instruments.xlsx", num_files_to_load=
         List of tuples [(name, token)].
     """
     try:
-        logging.info(f"Attempting to read names and tokens from {file_path}")
-        df = pd.read_excel(file_path, usecols=[0, 4])  # Column A = 'name', Column E = 'token'
+        source_path = Path(file_path)
+        cache_path = source_path.with_suffix(".csv")
+
+        if cache_path.exists() and cache_path.stat().st_mtime >= source_path.stat().st_mtime:
+            logging.info("Reading names and tokens from cache %s", cache_path)
+            with open(cache_path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                next(reader, None)  # Skip the name,token header
+                data = [tuple(row) for row in islice(reader, num_files_to_load)]
+        else:
+            logging.info("Attempting to read names and tokens from %s", file_path)
+            # calamine streams the sheet instead of building openpyxl's full XML DOM, and the
+            # ExcelFile handle parses the workbook's zip directory once for every sheet read from it.
+            # The whole sheet is read so the cache can serve any num_files_to_load later on.
+            with pd.ExcelFile(file_path, engine="calamine") as workbook:
+                df = workbook.parse(
+                    workbook.sheet_names[0],
+                    usecols=[0, 4],  # Column A = 'name', Column E = 'token'
+                    dtype="string"
+                )
+            df.columns = ["name", "token"]
+
+            try:
+                df.to_csv(cache_path, index=False, encoding="utf-8")
+                logging.info("Cached names and tokens to %s", cache_path)
+            except Exception as e:
+                logging.warning("Unable to cache names and tokens to %s: %s", cache_path, e)
 
-        if num_files_to_load is not None:
-            df = df.iloc[:num_files_to_load]  # Limit rows
+            if num_files_to_load is not None:
+                df = df.iloc[:num_files_to_load]  # Limit rows
 
-        # Extract names and tokens as a list of tuples
-        data = list(zip(df.iloc[:, 0].astype(str), df.iloc[:, 1].astype(str)))
-        logging.info(f"Successfully fetched {len(data)} names and tokens from {file_path}")
+            # Extract names and tokens as a list of tuples
+            data = list(df.itertuples(index=False, name=None))
+
+        logging.info("Successfully fetched %s names and tokens from %s", len(data), file_path)
         return data
     except Exception as e:
-        logging.error(f"Error reading names and tokens from {file_path}: {e}")
+        logging.error("Error reading names and tokens from %s: %s", file_path, e)
         return []
 
+# SQLite connection, opened once per thread
+_local = threading.local()
+
+def _conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_FILE, check_same_thread=False, isolation_level=None)
+        # Only takes effect while the database file is still empty, i.e. when it is first created
+        conn.execute("PRAGMA page_size=8192")
+        # WAL + synchronous=NORMAL only fsyncs at checkpoints instead of on every commit,
+        # and lets readers in other threads proceed while a write is in progress
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # Read pages straight from the OS page cache instead of copying them into SQLite's own
+        conn.execute("PRAGMA mmap_size=1073741824")
+        conn.execute("PRAGMA cache_size=-65536")
+        atexit.register(conn.close)
+        _local.conn = conn
+    return conn
+
+@contextmanager
+def _transaction():
+    """Run the enclosed statements in one explicit write transaction on this thread's connection."""
+    conn = _conn()
+    # IMMEDIATE takes the write lock up front, so concurrent writers wait on the busy timeout
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+
 # Initialize SQLite database
 def initialize_db():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS historical_data (
-            symboltoken TEXT,
-            interval TEXT,
-            timestamp TEXT,
-            open REAL,
-            high REAL,
-            low REAL,
-            close REAL,
-            volume REAL,
-            PRIMARY KEY (symboltoken, interval, timestamp)
-        )
-    """)
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS historical_data (
+                symboltoken TEXT,
+                interval TEXT,
+                timestamp TEXT,
+                open REAL,
+                high REAL,
+                low REAL,
+                close REAL,
+                volume REAL,
+                ts_epoch INTEGER,
+                PRIMARY KEY (symboltoken, interval, timestamp)
+            )
+        """)
+        # Databases created before ts_epoch existed get the column added and backfilled once.
+        # strftime('%s') reads the naive timestamp as UTC, the same way _to_epoch does
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(historical_data)")}
+        if "ts_epoch" not in columns:
+            conn.execute("ALTER TABLE historical_data ADD COLUMN ts_epoch INTEGER")
+            conn.execute("""
+                UPDATE historical_data SET ts_epoch = CAST(strftime('%s', timestamp) AS INTEGER)
+                WHERE ts_epoch IS NULL
+            """)
+        # Covering index: range reads in load_data_from_db are answered from the index alone.
+        # It is keyed on ts_epoch, so the old TEXT-keyed index is dropped
+        conn.execute("DROP INDEX IF EXISTS ix_hd_range")
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS ix_hd_epoch_range
+            ON historical_data (symboltoken, interval, ts_epoch, open, high, low, close, volume)
+        """)
+
+# Convert a naive timestamp (or a "%Y-%m-%d %H:%M" string) to epoch seconds for ts_epoch
+def _to_epoch(value):
+    return pd.Timestamp(value).value // 10**9
 
 # Save data to SQLite database
 def save_data_to_db(symboltoken, interval, data):
-    conn = sqlite3.connect(DB_FILE)
     try:
-        # Remove duplicates by ensuring no overlap with existing data in the database
-        existing_data_query = """
-            SELECT timestamp FROM historical_data
-            WHERE symboltoken = ? AND interval = ?
-        """
-        existing_timestamps = pd.read_sql_query(existing_data_query, conn, params=(symboltoken, interval))
-        
-        # Filter out rows with timestamps already in the database
-        if not existing_timestamps.empty:
-            existing_timestamps = existing_timestamps['timestamp'].astype(str).tolist()
-            data = data[~data['timestamp'].astype(str).isin(existing_timestamps)]
-        
-        # If there's any data left to save, insert it
-        if not data.empty:
-            data['symboltoken'] = symboltoken
-            data['interval'] = interval
-            data.to_sql('historical_data', conn, if_exists='append', index=False, method='multi')
-            logging.info(f"Successfully saved {len(data)} new records to the database.")
+        # Rows already in the database are skipped by SQLite itself through the
+        # (symboltoken, interval, timestamp) primary key, so nothing is read back first
+        records = data[['timestamp', 'open', 'high', 'low', 'close', 'volume']].assign(
+            timestamp=data['timestamp'].dt.strftime("%Y-%m-%d %H:%M:%S"),
+            ts_epoch=(data['timestamp'] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+        )
+        # Rows are streamed into the prepared statement rather than collected into a list first
+        rows = ((symboltoken, interval, *record) for record in records.itertuples(index=False, name=None))
+
+        with _transaction() as conn:
+            cursor = conn.executemany(
+                """
+                INSERT OR IGNORE INTO historical_data
+                    (symboltoken, interval, timestamp, open, high, low, close, volume, ts_epoch)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+
+        if cursor.rowcount > 0:
+            logging.info("Successfully saved %s new records to the database.", cursor.rowcount)
         else:
-            logging.info(f"No new data to save for {symboltoken} ({interval}). All records already exist in the database.")
+            logging.info("No new data to save for %s (%s). All records already exist in the database.", symboltoken, interval)
 
     except Exception as e:
-        logging.error(f"Error saving data to the database: {e}")
-    finally:
-        conn.close()
+        logging.error("Error saving data to the database: %s", e)
 
 # Load data from SQLite database
 def load_data_from_db(symboltoken, interval, from_date, to_date):
-    conn = sqlite3.connect(DB_FILE)
     query = """
-        SELECT * FROM historical_data
-        WHERE symboltoken = ? AND interval = ? AND timestamp BETWEEN ? AND ?
+        SELECT ts_epoch, open, high, low, close, volume FROM historical_data
+        WHERE symboltoken = ? AND interval = ? AND ts_epoch BETWEEN ? AND ?
+        ORDER BY ts_epoch
     """
-    data = pd.read_sql_query(query, conn, params=(symboltoken, interval, from_date, to_date))
-    conn.close()
-    if not data.empty:
-        data['timestamp'] = pd.to_datetime(data['timestamp'])  # Ensure timestamp is datetime
+    # The rows come back sorted from the (symboltoken, interval, ts_epoch) index, which
+    # fetch_historical_data_with_cache relies on when stitching segments without re-sorting.
+    # The range is compared as integers, and columns are built straight into Arrow buffers
+    # instead of materializing object columns and converting them afterwards
+    data = pd.read_sql_query(
+        query,
+        _conn(),
+        params=(symboltoken, interval, _to_epoch(from_date), _to_epoch(to_date)),
+        dtype_backend=DTYPE_BACKEND
+    )
+    data.insert(0, 'timestamp', pd.to_datetime(data.pop('ts_epoch'), unit='s'))
     return data
 
+# Summarize the cached range without loading it
+def cached_bounds(symboltoken, interval, from_date, to_date):
+    """
+    Returns the first and last cached timestamps and the number of cached rows in the range.
+
+    MIN/MAX/COUNT are answered from the (symboltoken, interval, ts_epoch) index,
+    so no candle data is read.
+
+    Returns:
+        Tuple (min_timestamp, max_timestamp, count); the timestamps are None when nothing is cached.
+    """
+    query = """
+        SELECT MIN(ts_epoch), MAX(ts_epoch), COUNT(*) FROM historical_data
+        WHERE symboltoken = ? AND interval = ? AND ts_epoch BETWEEN ? AND ?
+    """
+    params = (symboltoken, interval, _to_epoch(from_date), _to_epoch(to_date))
+    min_ts, max_ts, count = _conn().execute(query, params).fetchone()
+    if not count:
+        return None, None, 0
+    return pd.Timestamp(min_ts, unit='s'), pd.Timestamp(max_ts, unit='s'), count
+
+def _wait_for_api_slot():
+    """Block until this thread may start an API call, keeping all threads within API_REQUESTS_PER_SECOND."""
+    global _api_next_call_at
+    with _api_rate_lock:
+        now = time.monotonic()
+        call_at = max(now, _api_next_call_at)
+        _api_next_call_at = call_at + 1 / API_REQUESTS_PER_SECOND
+    if call_at > now:
+        time.sleep(call_at - now)
+
+def _is_rate_limited(reply):
+    """Whether a failed reply or error message says the access rate was exceeded."""
+    return "access rate" in str(reply).lower()
+
+# Call the candle API within its concurrency and rate limits, retrying rate-limited replies
+def _get_candle_data(obj, params):
+    for attempt in range(API_RATE_LIMIT_RETRIES + 1):
+        # Never run more than API_CONCURRENCY requests at once, nor start them faster than the rate limit
+        with _api_semaphore:
+            _wait_for_api_slot()
+            try:
+                response = obj.getCandleData(params)
+            except Exception as e:
+                # SmartConnect raises when the rate-limit reply is not JSON
+                if not _is_rate_limited(e):
+                    raise
+                response = {'status': False, 'message': str(e)}
+        if response.get('status') or not _is_rate_limited(response.get('message')):
+            break
+        if attempt < API_RATE_LIMIT_RETRIES:
+            delay = API_RATE_LIMIT_BACKOFF * 2 ** attempt
+            logging.warning(
+                "Rate limited fetching %s from %s to %s; retrying in %.1fs.",
+                params['symboltoken'], params['fromdate'], params['todate'], delay
+            )
+            time.sleep(delay)
+    else:
+        raise RateLimitError(
+            f"getCandleData for {params['symboltoken']} from {params['fromdate']} to {params['todate']} "
+            f"was still rate limited after {API_RATE_LIMIT_RETRIES} retries."
+        )
+
+    if not response.get('status'):
+        logging.warning(
+            "getCandleData failed for %s from %s to %s: %s (%s)",
+            params['symboltoken'], params['fromdate'], params['todate'], response.get('message'), response.get('errorcode')
+        )
+    return response
+
+# Fetch candles from the API as a DataFrame sorted by timestamp
+def _fetch_candles(obj, request, fromdate, todate):
+    params = {
+        "exchange": request.exchange,
+        "symboltoken": request.symboltoken,
+        "interval": request.interval,
+        "fromdate": fromdate,
+        "todate": todate
+    }
+    response = _get_candle_data(obj, params)
+    if not response.get('status') or not response['data']:
+        return pd.DataFrame()
+    columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    candles = pd.DataFrame(response['data'], columns=columns)
+    candles['timestamp'] = pd.to_datetime(candles['timestamp']).dt.tz_localize(None)
+    # Same schema as load_data_from_db returns for cached rows: the values are stored as REAL,
+    # so they come back as floats on DTYPE_BACKEND, while timestamps stay datetime64[ns]
+    values = columns[1:]
+    candles[values] = candles[values].astype('float64').convert_dtypes(
+        dtype_backend=DTYPE_BACKEND, convert_integer=False
+    )
+    return candles.sort_values(by='timestamp', ignore_index=True)
+
 # Fetch historical data with caching
 
-def fetch_historical_data_with_cache(obj, historical_data_config):
-    try:
-        # Validate required keys
-        required_keys = ["exchange", "symboltoken", "interval", "fromdate", "todate"]
-        for key in required_keys:
-            if key not in historical_data_config:
-                raise ValueError(f"Missing required key '{key}' in historical_data_config.")
+def fetch_historical_data_with_cache(obj, request):
+    """
+    Returns candles for the requested range, serving what it can from SQLite and fetching the rest.
 
+    Args:
+        obj (SmartConnect): Authenticated SmartConnect object.
+        request (HistoricalDataRequest): Exchange, token, interval and date range to load.
+
+    Returns:
+        DataFrame sorted by timestamp; empty if nothing could be loaded.
+    """
+    try:
         # Parse dates as strings and then convert to pandas Timestamps
-        from_date_str = historical_data_config["fromdate"]
-        to_date_str = historical_data_config["todate"]
+        from_date_str = request.fromdate
+        to_date_str = request.todate
 
         from_date = pd.to_datetime(from_date_str, format="%Y-%m-%d %H:%M")
         to_date = pd.to_datetime(to_date_str, format="%Y-%m-%d %H:%M")
@@ -115,78 +344,57 @@ def fetch_historical_data_with_cache(obj, historical_data_config):
         from_date = from_date.tz_localize(None)
         to_date = to_date.tz_localize(None)
 
-        # Load existing data from the database
-        cached_data = load_data_from_db(
-            historical_data_config["symboltoken"], 
-            historical_data_config["interval"], 
+        # Plan the fetch from the cached bounds; the cached rows themselves are loaded later
+        cached_start, cached_end, cached_count = cached_bounds(
+            request.symboltoken, 
+            request.interval, 
             from_date_str, 
             to_date_str
         )
 
-        # Ensure cached_data['timestamp'] is timezone-naive
-        if not cached_data.empty:
-            cached_data['timestamp'] = cached_data['timestamp'].dt.tz_localize(None)
-
         # Determine ranges to fetch
-        missing_data = pd.DataFrame()
-        if not cached_data.empty:
-            cached_start = cached_data['timestamp'].min()
-            cached_end = cached_data['timestamp'].max()
-
-            # Fetch data outside of cached range
+        before_data = pd.DataFrame()
+        after_data = pd.DataFrame()
+        if cached_count:
+            # Fetch data outside of cached range, keeping only rows the cache does not already hold
             if from_date < cached_start:
-                logging.info(f"Fetching data before cache for {historical_data_config['symboltoken']} from {from_date} to {cached_start}.")
-                params = historical_data_config.copy()
-                params["fromdate"] = from_date_str
-                params["todate"] = cached_start.strftime("%Y-%m-%d %H:%M")
-                response = obj.getCandleData(params)
-                if response.get('status'):
-                    raw_data = response['data']
-                    if raw_data:
-                        columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-                        missing_data_1 = pd.DataFrame(raw_data, columns=columns)
-                        missing_data_1['timestamp'] = pd.to_datetime(missing_data_1['timestamp']).dt.tz_localize(None)
-                        missing_data = pd.concat([missing_data, missing_data_1])
+                logging.info("Fetching data before cache for %s from %s to %s.", request.symboltoken, from_date, cached_start)
+                before_data = _fetch_candles(obj, request, from_date_str, cached_start.strftime("%Y-%m-%d %H:%M"))
+                if not before_data.empty:
+                    before_data = before_data[before_data['timestamp'] < cached_start]
 
             if to_date > cached_end:
-                logging.info(f"Fetching data after cache for {historical_data_config['symboltoken']} from {cached_end} to {to_date}.")
-                params = historical_data_config.copy()
-                params["fromdate"] = cached_end.strftime("%Y-%m-%d %H:%M")
-                params["todate"] = to_date_str
-                response = obj.getCandleData(params)
-                if response.get('status'):
-                    raw_data = response['data']
-                    if raw_data:
-                        columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-                        missing_data_2 = pd.DataFrame(raw_data, columns=columns)
-                        missing_data_2['timestamp'] = pd.to_datetime(missing_data_2['timestamp']).dt.tz_localize(None)
-                        missing_data = pd.concat([missing_data, missing_data_2])
+                logging.info("Fetching data after cache for %s from %s to %s.", request.symboltoken, cached_end, to_date)
+                after_data = _fetch_candles(obj, request, cached_end.strftime("%Y-%m-%d %H:%M"), to_date_str)
+                if not after_data.empty:
+                    after_data = after_data[after_data['timestamp'] > cached_end]
         else:
             # Fetch the entire range if no cache exists
-            logging.info(f"Fetching complete range for {historical_data_config['symboltoken']} from {from_date} to {to_date}.")
-            params = historical_data_config.copy()
-            params["fromdate"] = from_date_str
-            params["todate"] = to_date_str
-            response = obj.getCandleData(params)
-            if response.get('status'):
-                raw_data = response['data']
-                if raw_data:
-                    columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-                    missing_data = pd.DataFrame(raw_data, columns=columns)
-                    missing_data['timestamp'] = pd.to_datetime(missing_data['timestamp']).dt.tz_localize(None)
+            logging.info("Fetching complete range for %s from %s to %s.", request.symboltoken, from_date, to_date)
+            after_data = _fetch_candles(obj, request, from_date_str, to_date_str)
+
+        # Load existing data from the database
+        cached_data = pd.DataFrame()
+        if cached_count:
+            cached_data = load_data_from_db(
+                request.symboltoken, 
+                request.interval, 
+                from_date_str, 
+                to_date_str
+            )
 
         # Save new data to database
-        if not missing_data.empty:
-            missing_data.drop_duplicates(subset=['timestamp'], inplace=True)
-            save_data_to_db(historical_data_config["symboltoken"], historical_data_config["interval"], missing_data)
+        for new_data in (before_data, after_data):
+            if not new_data.empty:
+                save_data_to_db(request.symboltoken, request.interval, new_data)
 
-        # Combine cached and missing data
-        all_data = pd.concat([cached_data, missing_data]).drop_duplicates(subset=['timestamp']).sort_values(by='timestamp')
-        return all_data
+        # The segments are each sorted and lie before, inside and after the cached range
+        # respectively, so stitching them in order is already sorted and free of duplicates
+        segments = [segment for segment in (before_data, cached_data, after_data) if not segment.empty]
+        if not segments:
+            return pd.DataFrame()
+        return pd.concat(segments, ignore_index=True)
 
     except Exception as e:
-        logging.getLogger("trading_bot").error(f"Error fetching historical data: {e}")
+        logging.getLogger("trading_bot").error("Error fetching historical data: %s", e)
         return pd.DataFrame()
-
-# Initialize database
-initialize_db()
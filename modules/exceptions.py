@@ -7,3 +7,7 @@ class AuthenticationError(Exception):
 class TokenError(Exception):
     """Exception raised for token handling failures."""
     pass
+
+class RateLimitError(Exception):
+    """Exception raised when the API keeps rejecting requests for exceeding its rate limit."""
+    pass
@@ -1,7 +1,19 @@
 # modules/indicators.py
 
+import numpy as np
 import talib
 import logging
+from numba import njit
+
+@njit(cache=True)
+def _vwap(close, volume, out):
+    """Cumulative VWAP in one pass over close and volume, written into out."""
+    num = 0.0
+    den = 0.0
+    for i in range(close.size):
+        num += close[i] * volume[i]
+        den += volume[i]
+        out[i] = num / den if den else np.nan
 
 def calculate_indicators(data, indicator_config):
     """Calculate MACD, RSI, VWAP, and ATR indicators."""
@@ -9,16 +21,26 @@ def calculate_indicators(data, indicator_config):
         logging.warning("Empty data received for indicator calculation.")
         return data
     try:
-        data['MACD'], data['Signal'], _ = talib.MACD(
-            data['close'],
+        # Convert the inputs to contiguous float64 arrays once so TA-Lib does not copy them per call
+        close = np.ascontiguousarray(data['close'].to_numpy(dtype=np.float64))
+        high = np.ascontiguousarray(data['high'].to_numpy(dtype=np.float64))
+        low = np.ascontiguousarray(data['low'].to_numpy(dtype=np.float64))
+        volume = np.ascontiguousarray(data['volume'].to_numpy(dtype=np.float64))
+
+        macd, signal, _ = talib.MACD(
+            close,
             fastperiod=indicator_config['MACD_FAST'],
             slowperiod=indicator_config['MACD_SLOW'],
             signalperiod=indicator_config['MACD_SIGNAL']
         )
-        data['RSI'] = talib.RSI(data['close'], timeperiod=indicator_config['RSI_PERIOD'])
-        data['VWAP'] = (data['close'] * data['volume']).cumsum() / data['volume'].cumsum()
-        data['ATR'] = talib.ATR(data['high'], data['low'], data['close'], timeperiod=indicator_config['ATR_PERIOD'])
+        rsi = talib.RSI(close, timeperiod=indicator_config['RSI_PERIOD'])
+        vwap = np.empty_like(close)
+        _vwap(close, volume, vwap)
+        atr = talib.ATR(high, low, close, timeperiod=indicator_config['ATR_PERIOD'])
+
+        # Attach all indicator columns in a single step
+        data = data.assign(MACD=macd, Signal=signal, RSI=rsi, VWAP=vwap, ATR=atr)
         logging.info("Indicators calculated successfully.")
     except Exception as e:
-        logging.error(f"Error calculating indicators: {e}")
+        logging.error("Error calculating indicators: %s", e)
     return data
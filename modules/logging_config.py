@@ -1,20 +1,130 @@
 # modules/logging_config.py
 
+import atexit
 import logging
+import logging.handlers
+import multiprocessing
 import os
 import sys
+import time
+
+# Queue served by the listener started in setup_logging, shared with worker processes
+_log_queue = None
+
+# Size of the log file's write buffer
+LOG_FILE_BUFFER_SIZE = 64 * 1024
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler that writes through a large buffer instead of flushing after every record.
+
+    Records at flush_level and above are flushed straight away, so errors reach the disk
+    even if the process dies; everything else goes out when the buffer fills or on close.
+    """
+
+    def __init__(self, filename, buffer_size=LOG_FILE_BUFFER_SIZE, flush_level=logging.ERROR):
+        self.buffer_size = buffer_size
+        self.flush_level = flush_level
+        super().__init__(filename)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size, encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record):
+        # Same as StreamHandler.emit, minus its flush after every record
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= self.flush_level:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+class CachedTimeFormatter(logging.Formatter):
+    """
+    Formatter that reuses the formatted asctime second for records within the same second.
+
+    Only the milliseconds are formatted per record, instead of a time.strftime call each.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cached_time = (None, None)
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        second, formatted = self._cached_time
+        if second != int(record.created):
+            second = int(record.created)
+            formatted = time.strftime(self.default_time_format, self.converter(record.created))
+            self._cached_time = (second, formatted)
+        return self.default_msec_format % (formatted, record.msecs)
+
+# Shared by the log file and stdout handlers; built once when the module is imported
+LOG_FORMATTER = CachedTimeFormatter(
+    '%(asctime)s - [%(levelname)s] - %(thread)d - %(filename)s.%(funcName)s(%(lineno)d) - %(message)s'
+)
+
+def skip_process_info():
+    """
+    Stop filling in the process fields of each record, which the log format never shows.
+
+    Thread ids stay on, since every line includes the thread that logged it.
+    """
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
 
 def setup_logging(log_file='logs/trading_bot.log', level=logging.INFO):
-    """Configure logging for the trading bot."""
+    """
+    Configure logging for the trading bot.
+
+    Log calls only put records on a queue; a background listener thread writes them
+    to the buffered log file and stdout, so worker threads never wait on I/O. Worker processes
+    attach to the same queue through setup_worker_logging. Calling it again only
+    returns the logger, without starting a second listener.
+    """
+    global _log_queue
+    if _log_queue is not None:
+        return logging.getLogger("trading_bot")
+    skip_process_info()
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - [%(levelname)s] - %(thread)d - %(filename)s.%(funcName)s(%(lineno)d) - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    file_handler = BufferedFileHandler(log_file)
+    file_handler.setFormatter(LOG_FORMATTER)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(LOG_FORMATTER)
+
+    # Created in the spawn context the simulation workers are started with
+    _log_queue = multiprocessing.get_context("spawn").Queue()
+    listener = logging.handlers.QueueListener(_log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    # Drain the queue and flush the handlers on exit
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(_log_queue))
+
     # Create a logger for the trading bot
     logger = logging.getLogger("trading_bot")
     return logger
+
+def get_log_queue():
+    """Return the queue set up by setup_logging, to be passed to worker processes."""
+    return _log_queue
+
+def setup_worker_logging(log_queue, level=logging.INFO):
+    """
+    Configure logging in a worker process.
+
+    Records are put on the main process's queue, so they end up in the same log file
+    and stdout without the worker opening any handlers of its own.
+    """
+    skip_process_info()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    return logging.getLogger("trading_bot")
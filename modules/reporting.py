@@ -3,38 +3,139 @@
 import os
 import pandas as pd
 import logging
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from modules.utils import center_align_and_autofit_excel, remove_timezone, assert_timezone_naive  # Updated import
+from modules.utils import remove_timezone, assert_timezone_naive  # Updated import
 
-def add_summary_header(ws, content, span_range, freeze_at, header_fill_color="FFD700", font_size=14):
+# Cell formats shared by the reports; each workbook registers them once through add_format
+TITLE_FORMAT = {'bold': True, 'font_size': 14, 'align': 'center', 'valign': 'vcenter', 'bg_color': '#FFD700'}
+HEADER_FORMAT = {'bold': True, 'font_color': '#FFFFFF', 'align': 'center', 'valign': 'vcenter', 'bg_color': '#4F81BD'}
+PLAIN_HEADER_FORMAT = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}  # The header style of to_excel
+NET_PL_FORMAT = {'bold': True, 'align': 'center', 'valign': 'vcenter', 'bg_color': '#D9E1F2'}
+CENTER_FORMAT = {'align': 'center', 'valign': 'vcenter'}
+DATETIME_FORMAT = {'num_format': 'yyyy-mm-dd hh:mm:ss', 'align': 'center', 'valign': 'vcenter'}
+DATE_FORMAT = {'num_format': 'yyyy-mm-dd', 'align': 'center', 'valign': 'vcenter'}
+
+# Rows of the Final Summary sheet: metric shown, key in final_summary and the value used when it is missing
+FINAL_SUMMARY_METRICS = (
+    ('Initial Capital', 'Initial Capital', 0),
+    ('Final Capital', 'Final Capital', 0),
+    ('Number of Unsold Stocks in Portfolio', 'Current Stock Holding', 'N/A'),
+    ('Leverage Used', 'Leverage Used', 'N/A'),
+    ('RSI_PERIOD', 'RSI_PERIOD', 'N/A'),
+    ('MACD_FAST', 'MACD_FAST', 'N/A'),
+    ('MACD_SLOW', 'MACD_SLOW', 'N/A'),
+    ('MACD_SIGNAL', 'MACD_SIGNAL', 'N/A'),
+    ('ATR_PERIOD', 'ATR_PERIOD', 'N/A'),
+    ('ATR_THRESHOLD', 'ATR_THRESHOLD', 'N/A'),
+    ('INTERVAL', 'INTERVAL', 'N/A'),
+    ('SYMBOL_TOKEN', 'SYMBOL_TOKEN', 'N/A'),
+    ('FROM_DATE', 'FROM_DATE', 'Unknown'),
+    ('TO_DATE', 'TO_DATE', 'Unknown'),
+    ('TRADE_ALLOCATION', 'TRADE_ALLOCATION', 'N/A'),
+    ('TARGET_PROFIT_PERCENTAGE', 'TARGET_PROFIT_PERCENTAGE', 'N/A'),
+    ('ATR_MULTIPLIER', 'ATR_MULTIPLIER', 'N/A')
+)
+ROUNDED_METRICS = {'Initial Capital', 'Final Capital'}
+
+def add_formats(workbook):
+    """Registers the report formats with an xlsxwriter workbook once, returning them by name."""
+    return {
+        'title': workbook.add_format(TITLE_FORMAT),
+        'header': workbook.add_format(HEADER_FORMAT),
+        'plain_header': workbook.add_format(PLAIN_HEADER_FORMAT),
+        'net_pl': workbook.add_format(NET_PL_FORMAT),
+        'center': workbook.add_format(CENTER_FORMAT),
+        'datetime': workbook.add_format(DATETIME_FORMAT),
+        'date': workbook.add_format(DATE_FORMAT)
+    }
+
+def add_summary_header(ws, content, span_range, freeze_at, title_format):
     """
     Adds a stylized summary header to the given worksheet.
 
     Parameters:
-        ws (Worksheet): The worksheet to modify.
+        ws (Worksheet): The xlsxwriter worksheet to modify.
         content (str): The text content of the header.
         span_range (str): The range of cells to merge for the header (e.g., 'A1:M3').
         freeze_at (str): The cell at which to freeze panes (e.g., 'A5').
-        header_fill_color (str): Background color for the header (default: gold).
-        font_size (int): Font size for the header text.
+        title_format (Format): Format of the merged header cell (see TITLE_FORMAT).
     """
-    # Merge cells for the header
-    ws.merge_cells(span_range)
-    
-    # Get the top-left cell of the merged range
-    start_cell = ws[span_range.split(":")[0]]
-    
-    # Style the merged cells
-    start_cell.value = content
-    start_cell.font = Font(bold=True, size=font_size)
-    start_cell.alignment = Alignment(horizontal="center", vertical="center")
-    start_cell.fill = PatternFill(start_color=header_fill_color, end_color=header_fill_color, fill_type="solid")
-    
+    # Merge cells for the header and write the styled text into them
+    ws.merge_range(span_range, content, title_format)
+
     # Freeze panes below the header
-    ws.freeze_panes = freeze_at
+    ws.freeze_panes(freeze_at)
+
+def center_and_autofit_columns(ws, df, formats, startrow=0):
+    """
+    Centers the cells written from df and sizes each column to its longest value.
+
+    Done while the workbook is being written, instead of reopening the saved file.
+
+    Parameters:
+        ws (Worksheet): The xlsxwriter worksheet df was written to.
+        df (pd.DataFrame): The data written to the worksheet, header included.
+        formats (dict): Formats returned by add_formats for the worksheet's workbook.
+        startrow (int): Row the header of df was written to.
+    """
+    # Dates are written with a number format, so they are rewritten with a centered one
+    for col_num, date_format in set_centered_columns(ws, df, formats).items():
+        for row_num, value in enumerate(df.iloc[:, col_num], start=startrow + 1):
+            if pd.notna(value):
+                ws.write_datetime(row_num, col_num, value, date_format)
+
+def set_centered_columns(ws, df, formats):
+    """
+    Gives each column of df a centered format and a width fitting its longest value.
+
+    Parameters:
+        ws (Worksheet): The xlsxwriter worksheet df is written to.
+        df (pd.DataFrame): The data written to the worksheet.
+        formats (dict): Formats returned by add_formats for the worksheet's workbook.
 
-def save_results(trades, missed_signals, daily_summary, final_summary, signals_data, stock_name, output_dir="."):
+    Returns:
+        dict: Centered date format for each column number holding dates.
+    """
+    date_formats = {}
+    for col_num, column in enumerate(df.columns):
+        values = df[column]
+        width = max([len(str(column)), *values.astype(str).str.len()]) + 2  # Add some padding for readability
+        # The column format applies to every cell written without a format of its own
+        ws.set_column(col_num, col_num, width, formats['center'])
+
+        kind = pd.api.types.infer_dtype(values, skipna=True)
+        if kind in ('datetime64', 'datetime', 'date'):
+            date_formats[col_num] = formats['date'] if kind == 'date' else formats['datetime']
+    return date_formats
+
+def write_dataframe(ws, df, formats, header_format, startrow=0):
+    """
+    Writes df to the worksheet row by row, centered and autofit like center_and_autofit_columns.
+
+    Rows go out strictly in order, which a constant_memory workbook needs: it flushes each row
+    to disk once the next one is started, where to_excel writes a column at a time.
+
+    Parameters:
+        ws (Worksheet): The xlsxwriter worksheet to write to.
+        df (pd.DataFrame): The data to write, header included.
+        formats (dict): Formats returned by add_formats for the worksheet's workbook.
+        header_format (Format): Format of the header row.
+        startrow (int): Row to write the header of df to.
+    """
+    date_formats = set_centered_columns(ws, df, formats)
+    ws.write_row(startrow, 0, df.columns, header_format)
+
+    # Missing values are left as blank cells, as to_excel does
+    rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    for row_num, row in enumerate(rows, start=startrow + 1):
+        for col_num, value in enumerate(row):
+            if value is None:
+                continue
+            if col_num in date_formats:
+                ws.write_datetime(row_num, col_num, value, date_formats[col_num])
+            else:
+                ws.write(row_num, col_num, value)
+
+def save_results(trades, missed_signals, daily_summary, final_summary, signals_data, stock_name, output_dir, run_timestamp):
     """
     Save the trading results to an Excel file with stylized headers and formatting.
 
@@ -45,7 +146,8 @@ def save_results(trades, missed_signals, daily_summary, final_summary, signals_d
         final_summary (dict): Dictionary containing overall performance metrics.
         signals_data (pd.DataFrame): DataFrame containing generated signals.
         stock_name (str): Name of the stock.
-        output_dir (str): Directory where the Excel file will be saved.
+        output_dir (str): Existing directory where the Excel file will be saved.
+        run_timestamp (str): Timestamp of the run, shared by all of its reports.
     """
     # Remove timezone information from all relevant DataFrames
     trades = remove_timezone(trades)
@@ -64,12 +166,8 @@ def save_results(trades, missed_signals, daily_summary, final_summary, signals_d
         logging.critical(e)
         raise
 
-    # Ensure the directory exists
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Append timestamp and stock name to the file name
-    timestamp = pd.Timestamp.now().strftime("%Y-%m-%d_%H-%M-%S")
-    output_filename = os.path.join(output_dir, f"{stock_name}_{timestamp}.xlsx")
+    # Append the run timestamp and stock name to the file name
+    output_filename = os.path.join(output_dir, f"{stock_name}_{run_timestamp}.xlsx")
 
     # Rename the column Charges to Total Charges
     trades = trades.rename(columns={'Charges': 'Total Charges'})
@@ -90,68 +188,33 @@ def save_results(trades, missed_signals, daily_summary, final_summary, signals_d
     daily_summary = daily_summary.round({'Start of Day Capital': 2, 'End of Day Capital': 2})
 
     # Prepare the Final Summary sheet
-    final_summary_data = pd.DataFrame({
-        'Metric': [
-            'Initial Capital',
-            'Final Capital',
-            'Number of Unsold Stocks in Portfolio',
-            'Leverage Used',
-            'RSI_PERIOD',
-            'MACD_FAST',
-            'MACD_SLOW',
-            'MACD_SIGNAL',
-            'ATR_PERIOD',
-            'ATR_THRESHOLD',
-            'INTERVAL',
-            'SYMBOL_TOKEN',
-            'FROM_DATE',
-            'TO_DATE',
-            'TRADE_ALLOCATION',
-            'TARGET_PROFIT_PERCENTAGE',
-            'ATR_MULTIPLIER'
+    final_summary_data = pd.DataFrame(
+        [
+            (metric, round(final_summary.get(key, default), 2) if metric in ROUNDED_METRICS else final_summary.get(key, default))
+            for metric, key, default in FINAL_SUMMARY_METRICS
         ],
-        'Value': [
-            round(final_summary.get('Initial Capital', 0), 2),
-            round(final_summary.get('Final Capital', 0), 2),
-            final_summary.get('Current Stock Holding', 'N/A'),
-            final_summary.get('Leverage Used', 'N/A'),
-            final_summary.get('RSI_PERIOD', 'N/A'),
-            final_summary.get('MACD_FAST', 'N/A'),
-            final_summary.get('MACD_SLOW', 'N/A'),
-            final_summary.get('MACD_SIGNAL', 'N/A'),
-            final_summary.get('ATR_PERIOD', 'N/A'),
-            final_summary.get('ATR_THRESHOLD', 'N/A'),
-            final_summary.get('INTERVAL', 'N/A'),
-            final_summary.get('SYMBOL_TOKEN', 'N/A'),
-            final_summary.get('FROM_DATE', 'Unknown'),
-            final_summary.get('TO_DATE', 'Unknown'),
-            final_summary.get('TRADE_ALLOCATION', 'N/A'),
-            final_summary.get('TARGET_PROFIT_PERCENTAGE', 'N/A'),
-            final_summary.get('ATR_MULTIPLIER', 'N/A')
-        ]
-    })
+        columns=['Metric', 'Value']
+    )
+
+    # Use Pandas ExcelWriter with xlsxwriter engine in constant_memory mode, so each row is flushed
+    # to disk as it is written instead of holding every cell of the large Signals sheet in memory
+    with pd.ExcelWriter(output_filename, engine='xlsxwriter', engine_kwargs={'options': {'constant_memory': True}}) as writer:
+        formats = add_formats(writer.book)
 
-    # Use Pandas ExcelWriter with openpyxl engine
-    with pd.ExcelWriter(output_filename, engine='openpyxl') as writer:
-        # Create a new workbook and add sheets
-        trades.to_excel(writer, sheet_name="Trades", index=False, startrow=4)
+        # Create a new workbook and add sheets; rows must be written top to bottom
+        ws_trades = writer.book.add_worksheet("Trades")
         add_summary_header(
-            writer.book["Trades"],
+            ws_trades,
             content=f"Trade Summary for {stock_name} from {final_summary.get('FROM_DATE', 'Unknown')} to {final_summary.get('TO_DATE', 'Unknown')}",
             span_range="A1:M3",
-            freeze_at="A6"
+            freeze_at="A6",
+            title_format=formats['title']
         )
 
-        # Style the column headers (row 5) in 'Trades' sheet
-        ws_trades = writer.book["Trades"]
-        blue_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")  # White font for contrast
-        for cell in ws_trades[5]:  # Row 5 contains the column headers
-            cell.fill = blue_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+        # Row 5 contains the styled column headers in 'Trades' sheet
+        write_dataframe(ws_trades, trades, formats, formats['header'], startrow=4)
 
-        # Write other sheets
+        # Write other sheets, the large Signals sheet last
         sheets = {
             "Missed Signals": missed_signals,
             "Daily Summary": daily_summary,
@@ -160,22 +223,17 @@ def save_results(trades, missed_signals, daily_summary, final_summary, signals_d
         }
 
         for sheet_name, df in sheets.items():
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
-            ws = writer.book[sheet_name]
+            ws = writer.book.add_worksheet(sheet_name)
             # Freeze the header row for other sheets
-            ws.freeze_panes = ws["A2"]
+            ws.freeze_panes("A2")
             # Optionally, add headers styling similar to Trades
             if sheet_name != "Final Summary":  # Assuming Final Summary has different headers
-                header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-                header_font = Font(bold=True, color="FFFFFF")
-                for cell in ws[1]:  # First row contains the column headers
-                    cell.fill = header_fill
-                    cell.font = header_font
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
+                header_format = formats['header']
+            else:
+                header_format = formats['plain_header']
+            write_dataframe(ws, df, formats, header_format)  # First row contains the column headers
 
-    # Apply alignment and autofit
-    center_align_and_autofit_excel(output_filename)
-    logging.info(f"Results saved to {output_filename}")
+    logging.info("Results saved to %s", output_filename)
 
 def save_summary(summary_data, summary_file, from_date, to_date, buy_rsi_threshold, sell_rsi_threshold, trade_config, indicator_config, historical_data):
     """
@@ -241,39 +299,30 @@ def save_summary(summary_data, summary_file, from_date, to_date, buy_rsi_thresho
     trade_settings_df = pd.DataFrame(trade_settings, columns=["Metrics", "Value"])
 
     # Create a new Excel workbook using Pandas ExcelWriter
-    with pd.ExcelWriter(summary_file, engine='openpyxl') as writer:
+    with pd.ExcelWriter(summary_file, engine='xlsxwriter') as writer:
+        formats = add_formats(writer.book)
+
         # Write Summary sheet
         summary_df.to_excel(writer, sheet_name="Summary", index=False, startrow=4)
-        ws_summary = writer.book["Summary"]
+        ws_summary = writer.sheets["Summary"]
         header_text = f"Performance Summary from {from_date} to {to_date}"
-        add_summary_header(ws_summary, content=header_text, span_range="A1:D3", freeze_at="A6")
+        add_summary_header(ws_summary, content=header_text, span_range="A1:D3", freeze_at="A6", title_format=formats['title'])
 
         # Style the column headers (row 5) in 'Summary' sheet
-        header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")  # White font for contrast
-        for cell in ws_summary[5]:  # Row 5 contains the column headers
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-        
+        ws_summary.write_row(4, 0, summary_df.columns, formats['header'])  # Row 5 contains the column headers
+        center_and_autofit_columns(ws_summary, summary_df, formats, startrow=4)
+
         # Style the "Net P/L (₹)" cell in the first row
-        net_pl_cell = ws_summary["D6"]  # Adjust if startrow is different
-        net_pl_cell.font = Font(bold=True)
-        net_pl_cell.alignment = Alignment(horizontal="center", vertical="center")
-        net_pl_cell.fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+        ws_summary.write("D6", summary_df.at[0, 'Net P/L (₹)'], formats['net_pl'])  # Adjust if startrow is different
 
         # Write Trade Settings sheet
         trade_settings_df.to_excel(writer, sheet_name="Trade Settings", index=False, startrow=4)
-        ws_settings = writer.book["Trade Settings"]
+        ws_settings = writer.sheets["Trade Settings"]
         header_text = "Trade Settings Overview"
-        add_summary_header(ws_settings, content=header_text, span_range="A1:B3", freeze_at="A5")
+        add_summary_header(ws_settings, content=header_text, span_range="A1:B3", freeze_at="A5", title_format=formats['title'])
 
         # Style the column headers (row 5) in 'Trade Settings' sheet
-        for cell in ws_settings[5]:  # Row 5 contains the column headers
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Apply alignment and autofit
-    center_align_and_autofit_excel(summary_file)
-    logging.info(f"Styled performance summary saved to {summary_file}")
+        ws_settings.write_row(4, 0, trade_settings_df.columns, formats['header'])  # Row 5 contains the column headers
+        center_and_autofit_columns(ws_settings, trade_settings_df, formats, startrow=4)
+
+    logging.info("Styled performance summary saved to %s", summary_file)
@@ -1,6 +1,43 @@
 # modules/signals.py
 
 import logging
+import numpy as np
+from numba import njit
+
+@njit(cache=True)
+def _dual_rolling_mean(values, short_window, long_window):
+    """
+    Means over two trailing windows of values, computed together in a single pass.
+    Each is NaN until its window holds that many non-NaN values, matching pandas
+    rolling(window).mean() with its default min_periods.
+    """
+    n = values.size
+    short_out = np.full(n, np.nan)
+    long_out = np.full(n, np.nan)
+    short_total = long_total = 0.0
+    short_count = long_count = 0
+    for i in range(n):
+        value = values[i]
+        if not np.isnan(value):
+            short_total += value
+            short_count += 1
+            long_total += value
+            long_count += 1
+        if i >= short_window:
+            old = values[i - short_window]
+            if not np.isnan(old):
+                short_total -= old
+                short_count -= 1
+        if i >= long_window:
+            old = values[i - long_window]
+            if not np.isnan(old):
+                long_total -= old
+                long_count -= 1
+        if short_count == short_window:
+            short_out[i] = short_total / short_window
+        if long_count == long_window:
+            long_out[i] = long_total / long_window
+    return short_out, long_out
 
 def generate_signals(data, indicator_config):
     """
@@ -18,37 +55,53 @@ def generate_signals(data, indicator_config):
         buy_rsi_threshold = indicator_config.get('BUY_RSI_THRESHOLD') # This is needed for normal RSI for buy signal
         sell_rsi_threshold = indicator_config.get('SELL_RSI_THRESHOLD')
 
+        # Work on plain float arrays; NaN compares False, like the pandas comparisons it replaces
+        close = np.ascontiguousarray(data['close'].to_numpy(dtype=np.float64))
+        rsi = data['RSI'].to_numpy(dtype=np.float64)
+        macd = data['MACD'].to_numpy(dtype=np.float64)
+        signal = data['Signal'].to_numpy(dtype=np.float64)
+        atr = data['ATR'].to_numpy(dtype=np.float64)
+        vwap = data['VWAP'].to_numpy(dtype=np.float64)
+
         # Calculate SMA 50 and SMA 200
-        data['SMA50'] = data['close'].rolling(window=50).mean()
-        data['SMA200'] = data['close'].rolling(window=200).mean()
+        data['SMA50'], data['SMA200'] = _dual_rolling_mean(close, 50, 200)
 
-        # RSI Recovery Logic
-        data['RSI_Recovery'] = (data['RSI'].shift(1) < buy_rsi_threshold_low) & (data['RSI'] > buy_rsi_threshold_high)
-
-        # VWAP Recovery Logic
-        data['VWAP_Recovery'] = (data['close'].shift(1) < data['VWAP']) & (data['close'] > data['VWAP'])
+        # Each condition is evaluated into one scratch mask and ANDed into the signal in place
+        n = close.size
+        condition = np.empty(n, dtype=bool)
 
         # Buy Signal Logic
-        data['Buy_Signal'] = (
-            data['RSI_Recovery'] &
-            #(data['RSI'] < buy_rsi_threshold) &
-            (data['MACD'] > data['Signal']) &
-            (data['ATR'] > atr_threshold) &
-            #(data['close'] < data['VWAP']) &
-            data['VWAP_Recovery'] 
-            #(data['SMA50'] > data['SMA200']) &
-            #(data['SMA50'].shift(1) <= data['SMA200'].shift(1))  # Golden Cross
-        )
+        buy_signal = np.zeros(n, dtype=bool)
+        # RSI Recovery Logic: the first bar has no previous RSI and never qualifies
+        np.less(rsi[:-1], buy_rsi_threshold_low, out=buy_signal[1:])
+        np.greater(rsi, buy_rsi_threshold_high, out=condition)
+        buy_signal &= condition
+        np.greater(macd, signal, out=condition)
+        buy_signal &= condition
+        np.greater(atr, atr_threshold, out=condition)
+        buy_signal &= condition
+        # VWAP Recovery Logic
+        np.greater(close, vwap, out=condition)
+        buy_signal &= condition
+        np.less(close[:-1], vwap[1:], out=condition[1:])
+        buy_signal[1:] &= condition[1:]
+        #(rsi < buy_rsi_threshold)
+        #(close < vwap)
+        #(SMA50 > SMA200) & (SMA50.shift(1) <= SMA200.shift(1))  # Golden Cross
 
         # Sell Signal Logic
-        data['Sell_Signal'] = (
-            (data['MACD'] < data['Signal']) &
-            (data['RSI'] > sell_rsi_threshold) &
-            (data['ATR'] > atr_threshold) &
-            (data['close'] > data['VWAP'])
-        )
-
-        logging.info(f"Generated {data['Buy_Signal'].sum()} Buy and {data['Sell_Signal'].sum()} Sell signals.")
+        sell_signal = np.less(macd, signal)
+        np.greater(rsi, sell_rsi_threshold, out=condition)
+        sell_signal &= condition
+        np.greater(atr, atr_threshold, out=condition)
+        sell_signal &= condition
+        np.greater(close, vwap, out=condition)
+        sell_signal &= condition
+
+        data['Buy_Signal'] = buy_signal
+        data['Sell_Signal'] = sell_signal
+
+        logging.info("Generated %s Buy and %s Sell signals.", data['Buy_Signal'].sum(), data['Sell_Signal'].sum())
     except Exception as e:
-        logging.error(f"Error generating signals: {e}")
+        logging.error("Error generating signals: %s", e)
     return data, buy_rsi_threshold_low, buy_rsi_threshold_high
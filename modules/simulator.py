@@ -1,23 +1,73 @@
 # modules/trades.py
 
 import logging
-from collections import deque
+import numpy as np
 import pandas as pd
+from numba import njit
 
-def calculate_transaction_charges(price, quantity, transaction_type, charges_config):
+# Order of the rates in each row of the charges array passed to the kernels
+CHARGE_KEYS = ('BROKERAGE', 'STT', 'TRANSACTION', 'SEBI', 'GST', 'STAMP')
+BUY, SELL = 0, 1
+
+# Codes stored in the trade and missed-signal records, decoded into labels after the simulation
+TRADE_TYPES = np.array(['Buy', 'Sell', 'Square Off'])
+TRADE_REASONS = np.array([
+    'Buy Signal',
+    'Sell Signal Triggered',
+    'Target Profit Reached',
+    'Trailing Stop-Loss Triggered',
+    'Square Off Before Market Close'
+])
+MISSED_REASONS = np.array(['Buy restricted near market close', 'Insufficient Funds'])
+
+# Market close in minutes after midnight, and the cutoffs before it
+MARKET_CLOSE_MINUTES = 15 * 60 + 30
+SQUARE_OFF_MINUTES = 30  # Square off all positions 30 minutes before close
+NO_NEW_BUYS_MINUTES = 60  # No new buys 60 minutes before close
+NS_PER_MINUTE = 60 * 10**9
+NS_PER_DAY = 24 * 60 * NS_PER_MINUTE
+
+def charges_array(charges_config):
     """
-    Calculate transaction charges based on price, quantity, and transaction type (BUY/SELL).
+    Resolve the BUY/SELL sections of the charges config into a 2x6 array of fractional rates.
+
+    Rows are BUY and SELL, columns follow CHARGE_KEYS. The config's percentages are divided
+    by 100 here once, so pricing an order is only multiplications. Stamp duty only applies
+    to buys, so the SELL stamp rate is always zero
+    and the SELL section does not need a STAMP entry.
     """
+    def rate(side, key):
+        # SELL has no stamp duty, so its section may omit the key entirely
+        if side == 'SELL' and key == 'STAMP':
+            return 0.0
+        return charges_config[side][key] / 100
+
+    rates = np.array([[rate(side, key) for key in CHARGE_KEYS] for side in ('BUY', 'SELL')])
+    return rates
+
+@njit(cache=True)
+def _transaction_charges(price, quantity, rates):
+    """Charges for one order given its row of the charges array, as (total, brokerage, stt, transaction, sebi, gst, stamp)."""
     turnover = price * quantity
-    brokerage = min(turnover * (charges_config[transaction_type]['BROKERAGE'] / 100), 20)
-    stt = turnover * (charges_config[transaction_type]['STT'] / 100)
-    transaction_charge = turnover * (charges_config[transaction_type]['TRANSACTION'] / 100)
-    sebi_charge = turnover * (charges_config[transaction_type]['SEBI'] / 100)
-    gst = (brokerage + transaction_charge + sebi_charge) * (charges_config[transaction_type]['GST'] / 100)
-    stamp_duty = turnover * (charges_config[transaction_type]['STAMP'] / 100) if transaction_type == "BUY" else 0
+    brokerage = min(turnover * rates[0], 20)
+    stt = turnover * rates[1]
+    transaction_charge = turnover * rates[2]
+    sebi_charge = turnover * rates[3]
+    gst = (brokerage + transaction_charge + sebi_charge) * rates[4]
+    stamp_duty = turnover * rates[5]
     total_charges = brokerage + stt + transaction_charge + sebi_charge + gst + stamp_duty
+    return total_charges, brokerage, stt, transaction_charge, sebi_charge, gst, stamp_duty
+
+def calculate_transaction_charges(price, quantity, transaction_type, charges_config):
+    """
+    Calculate transaction charges based on price, quantity, and transaction type (BUY/SELL).
+    """
+    side = BUY if transaction_type == "BUY" else SELL
+    total, brokerage, stt, transaction_charge, sebi_charge, gst, stamp_duty = _transaction_charges(
+        float(price), float(quantity), charges_array(charges_config)[side]
+    )
     return {
-        'total': total_charges,
+        'total': total,
         'brokerage': brokerage,
         'stt': stt,
         'transaction_charge': transaction_charge,
@@ -26,211 +76,290 @@ def calculate_transaction_charges(price, quantity, transaction_type, charges_con
         'stamp_duty': stamp_duty
     }
 
-def simulate_trades(data, initial_capital, trade_allocation, leverage, target_profit_percentage, atr_multiplier, charges_config, indicator_config, historical_data):
+@njit(cache=True)
+def _record_trade(trades, k, bar, trade_type, reason, price, shares, profit_loss, charges):
+    """Write one trade at position k of the trade column arrays."""
+    bars, types, reasons, prices, shares_column, profit_loss_column, charges_columns = trades
+    bars[k] = bar
+    types[k] = trade_type
+    reasons[k] = reason
+    prices[k] = price
+    shares_column[k] = shares
+    profit_loss_column[k] = profit_loss
+    for j in range(7):
+        charges_columns[j, k] = charges[j]
+
+@njit(cache=True)
+def _simulate_core(timestamps, prices, atrs, buy_signals, sell_signals, days, day_index, rates,
+                   initial_capital, trade_allocation, leverage, target_profit_percentage, atr_multiplier):
     """
-    Simulate trades based on generated signals, calculate profits/losses, and record trades.
-    
-    Parameters:
-        data (pd.DataFrame): Data containing price and indicator information.
-        initial_capital (float): Starting capital for trading.
-        trade_allocation (float): Fraction of capital to allocate per trade.
-        leverage (int): Leverage factor.
-        target_profit_percentage (float): Percentage at which to take profit.
-        atr_multiplier (float): Multiplier for ATR to set stop-loss.
-        charges_config (dict): Configuration for transaction charges.
-        indicator_config (dict): Configuration for indicators like RSI period.
-        historical_data (dict): Historical data configurations (e.g., interval, dates).
-    
-    Returns:
-        trades_df (pd.DataFrame): DataFrame containing all executed trades.
-        missed_signals_df (pd.DataFrame): DataFrame containing all missed signals.
-        daily_summary_df (pd.DataFrame): DataFrame containing daily capital summaries.
-        final_summary (dict): Dictionary containing overall performance metrics.
+    Bar-by-bar simulation over plain arrays.
+
+    Open positions are the first npos rows of a (shares, price, buy_charges, margin_used,
+    target_price, trailing_stop_loss) array, kept in entry order. Trades, missed signals and
+    days are each written into preallocated column arrays, returned trimmed to what was filled;
+    totals are left to the caller to reduce from the trade columns.
+    Each bar's day is days[day_index[i]], as days since the epoch.
     """
+    n = prices.size
     capital = initial_capital  # Total capital including realized profits/losses
     free_cash = initial_capital  # Tracks cash available for margin allocation
-    total_profit_loss = 0  # Tracks the cumulative profit or loss
-    total_revenue = 0      # Tracks the total revenue from selling shares
-    total_cost = 0         # Tracks the total cost of buying shares
-    trades = []           # List to store all trades
-    missed_signals = []   # Tracks missed buy/sell signals
-    daily_summary = []    # Tracks daily start/end capital
-    long_positions = deque()  # Queue to track active buy positions
-    current_day = None
-    daily_margin_used = 0  # Tracks margin used for the day
-    daily_profit_loss = 0  # Tracks profit/loss for the day
-
-    # Unpack historical_data for use within the function
-    instrument_key = historical_data.get('INSTRUMENT_KEY', 'N/A')
-    FROM_DATE = historical_data.get('fromdate', 'N/A')
-    TO_DATE = historical_data.get('todate', 'N/A')
+    daily_margin_used = 0.0  # Tracks margin used for the day
+    start_of_day_capital = capital
+    square_off_at = 0
+    no_new_buys_at = 0
+
+    # Every bar opens at most one position and every trade is a buy or the close of one
+    positions = np.empty((n, 6))
+    npos = 0
+    # Lowest target and highest stop among the open positions, so bars where neither is hit skip them
+    lowest_target = np.inf
+    highest_stop = -np.inf
+    trades = (
+        np.empty(2 * n, dtype=np.int64),  # Bar index, turned into Time afterwards
+        np.empty(2 * n, dtype=np.int64),  # Index into TRADE_TYPES
+        np.empty(2 * n, dtype=np.int64),  # Index into TRADE_REASONS
+        np.empty(2 * n),                  # Price
+        np.empty(2 * n, dtype=np.int64),  # Shares
+        np.empty(2 * n),                  # Profit/Loss
+        np.empty((7, 2 * n))              # One row per value returned by _transaction_charges
+    )
+    n_trades = 0
+    missed_bars = np.empty(n, dtype=np.int64)
+    missed_prices = np.empty(n)
+    missed_reasons = np.empty(n, dtype=np.int64)  # Index into MISSED_REASONS
+    n_missed = 0
+    summary_days = np.empty(n, dtype=np.int64)
+    start_of_day_capitals = np.empty(n)
+    end_of_day_capitals = np.empty(n)
+    n_days = 0
 
-    for i, row in data.iterrows():
-        timestamp = row['timestamp']
-        price = row['close']
-        trade_day = timestamp.date()
+    for i in range(n):
+        price = prices[i]
+        new_day = i == 0 or day_index[i] != day_index[i - 1]
 
-        # Define cutoff times for the day
-        market_close_time = timestamp.replace(hour=15, minute=30, second=0, microsecond=0)
-        square_off_time = market_close_time - pd.Timedelta(minutes=30)  # 30 minutes before close
-        no_new_buys_time = market_close_time - pd.Timedelta(minutes=60)  # 60 minutes before close
+        # Cutoff times are worked out once per day, as nanoseconds like the timestamps
+        if new_day:
+            market_close_at = days[day_index[i]] * NS_PER_DAY + MARKET_CLOSE_MINUTES * NS_PER_MINUTE
+            square_off_at = market_close_at - SQUARE_OFF_MINUTES * NS_PER_MINUTE
+            no_new_buys_at = market_close_at - NO_NEW_BUYS_MINUTES * NS_PER_MINUTE
+        after_square_off = timestamps[i] >= square_off_at
 
         # Square off all positions 30 minutes before market close
-        if timestamp >= square_off_time and long_positions:
-            for position in list(long_positions):
-                shares_to_sell = position['shares']
-                sell_charges_details = calculate_transaction_charges(price, shares_to_sell, "SELL", charges_config)
-                sell_revenue = shares_to_sell * price - sell_charges_details['total']
-                cost = shares_to_sell * position['price'] + position['buy_charges']  # Include buy charges
+        if after_square_off and npos:
+            for p in range(npos):
+                shares_to_sell = positions[p, 0]
+                sell_charges = _transaction_charges(price, shares_to_sell, rates[1])
+                sell_revenue = shares_to_sell * price - sell_charges[0]
+                cost = shares_to_sell * positions[p, 1] + positions[p, 2]  # Include buy charges
                 profit_loss = sell_revenue - cost  # Deduct buy cost from sell revenue
 
-                total_profit_loss += profit_loss  # Track cumulative profit/loss
-                daily_profit_loss += profit_loss  # Track daily profit/loss
                 capital += profit_loss  # Update total capital
-                free_cash += position['margin_used'] + sell_revenue  # Replenish free cash (margin + revenue)
-                long_positions.remove(position)
-
-                trades.append({
-                    'Time': timestamp,
-                    'Type': 'Square Off',
-                    'Price': price,
-                    'Shares': shares_to_sell,
-                    'Profit/Loss': profit_loss,
-                    'Charges': sell_charges_details['total'],
-                    'Brokerage': sell_charges_details['brokerage'],
-                    'STT': sell_charges_details['stt'],
-                    'Transaction Charge': sell_charges_details['transaction_charge'],
-                    'SEBI Charge': sell_charges_details['sebi_charge'],
-                    'GST': sell_charges_details['gst'],
-                    'Stamp Duty': sell_charges_details['stamp_duty'],
-                    'Reason': "Square Off Before Market Close"
-                })
+                free_cash += positions[p, 3] + sell_revenue  # Replenish free cash (margin + revenue)
+                _record_trade(trades, n_trades, i, 2, 4, price, shares_to_sell, profit_loss, sell_charges)
+                n_trades += 1
+            npos = 0
+            lowest_target = np.inf
+            highest_stop = -np.inf
 
         # Start of a new day
-        if current_day != trade_day:
-            if current_day is not None:
-                # Log the previous day's summary
-                daily_summary.append({
-                    'Date': current_day,
-                    'Start of Day Capital': start_of_day_capital,
-                    'End of Day Capital': capital
-                })
+        if new_day:
+            if n_days:
+                # Close the previous day's summary
+                end_of_day_capitals[n_days - 1] = capital
             # Prepare for the new day
-            current_day = trade_day
+            summary_days[n_days] = days[day_index[i]]
             start_of_day_capital = capital
+            start_of_day_capitals[n_days] = start_of_day_capital
+            n_days += 1
             free_cash = capital  # Reset free cash for the new day
-            daily_margin_used = 0
-            daily_profit_loss = 0
+            daily_margin_used = 0.0
 
         # Skip buy trades 60 minutes before market close
-        if timestamp >= no_new_buys_time:
-            if row['Buy_Signal']:
-                missed_signals.append({'Time': timestamp, 'Price': price, 'Reason': 'Buy restricted near market close'})
+        if timestamps[i] >= no_new_buys_at:
+            if buy_signals[i]:
+                missed_bars[n_missed] = i
+                missed_prices[n_missed] = price
+                missed_reasons[n_missed] = 0
+                n_missed += 1
                 continue
 
         # Buy Signal Logic
-        if row['Buy_Signal']:
+        if buy_signals[i]:
             allocated_margin = free_cash * trade_allocation  # Margin for the trade
             leveraged_buying_power = allocated_margin * leverage  # Effective buying power
 
             if leveraged_buying_power >= price:
-                shares_to_buy = int(leveraged_buying_power // price)
+                shares_to_buy = float(int(leveraged_buying_power // price))
                 if shares_to_buy > 0:
-                    buy_charges_details = calculate_transaction_charges(price, shares_to_buy, "BUY", charges_config)
-                    buy_cost = shares_to_buy * price + buy_charges_details['total']
-                    total_cost += buy_cost
+                    buy_charges = _transaction_charges(price, shares_to_buy, rates[0])
                     free_cash -= allocated_margin  # Deduct margin from free cash
                     daily_margin_used += allocated_margin  # Track daily margin usage
 
                     # Append the buy position
-                    long_positions.append({
-                        'shares': shares_to_buy,
-                        'price': price,
-                        'buy_charges': buy_charges_details['total'],  # Store buy charges
-                        'margin_used': allocated_margin,  # Store the margin used for the position
-                        'target_price': price * (1 + target_profit_percentage / 100),
-                        'trailing_stop_loss': price - (row['ATR'] * atr_multiplier)
-                    })
-
-                    trades.append({
-                        'Time': timestamp,
-                        'Type': 'Buy',
-                        'Price': price,
-                        'Shares': shares_to_buy,
-                        'Profit/Loss': 0,
-                        'Charges': buy_charges_details['total'],
-                        'Brokerage': buy_charges_details['brokerage'],
-                        'STT': buy_charges_details['stt'],
-                        'Transaction Charge': buy_charges_details['transaction_charge'],
-                        'SEBI Charge': buy_charges_details['sebi_charge'],
-                        'GST': buy_charges_details['gst'],
-                        'Stamp Duty': buy_charges_details['stamp_duty'],
-                        'Reason': "Buy Signal"
-                    })
+                    positions[npos, 0] = shares_to_buy
+                    positions[npos, 1] = price
+                    positions[npos, 2] = buy_charges[0]  # Store buy charges
+                    positions[npos, 3] = allocated_margin  # Store the margin used for the position
+                    positions[npos, 4] = price * (1 + target_profit_percentage / 100)
+                    positions[npos, 5] = price - (atrs[i] * atr_multiplier)
+                    if positions[npos, 4] < lowest_target:
+                        lowest_target = positions[npos, 4]
+                    if positions[npos, 5] > highest_stop:
+                        highest_stop = positions[npos, 5]
+                    npos += 1
+
+                    _record_trade(trades, n_trades, i, 0, 0, price, shares_to_buy, 0.0, buy_charges)
+                    n_trades += 1
             else:
-                missed_signals.append({'Time': timestamp, 'Price': price, 'Reason': 'Insufficient Funds'})
-
-        # Sell Signal Logic
-        if long_positions:
-            for position in list(long_positions):
-                reason = None
-                if row['Sell_Signal']:
-                    reason = "Sell Signal Triggered"
-                elif price >= position['target_price']:
-                    reason = "Target Profit Reached"
-                elif price <= position['trailing_stop_loss']:
-                    reason = "Trailing Stop-Loss Triggered"
-                elif timestamp >= square_off_time:
-                    reason = "Square Off Before Market Close"
-
-                if reason:
-                    shares_to_sell = position['shares']
-                    sell_charges_details = calculate_transaction_charges(price, shares_to_sell, "SELL", charges_config)
-                    sell_revenue = shares_to_sell * price - sell_charges_details['total']
-                    cost = shares_to_sell * position['price'] + position['buy_charges']  # Include buy charges
-                    profit_loss = sell_revenue - cost  # Deduct buy cost from sell revenue
-
-                    total_profit_loss += profit_loss
-                    daily_profit_loss += profit_loss
-                    total_revenue += sell_revenue
-                    capital += profit_loss
-                    free_cash += position['margin_used'] + sell_revenue  # Replenish free cash (margin + revenue)
-
-                    trades.append({
-                        'Time': timestamp,
-                        'Type': 'Sell',
-                        'Price': price,
-                        'Shares': shares_to_sell,
-                        'Profit/Loss': profit_loss,
-                        'Charges': sell_charges_details['total'],
-                        'Brokerage': sell_charges_details['brokerage'],
-                        'STT': sell_charges_details['stt'],
-                        'Transaction Charge': sell_charges_details['transaction_charge'],
-                        'SEBI Charge': sell_charges_details['sebi_charge'],
-                        'GST': sell_charges_details['gst'],
-                        'Stamp Duty': sell_charges_details['stamp_duty'],
-                        'Reason': reason
-                    })
-                    long_positions.remove(position)
-
-    # Final summary at the end of the simulation
-    if current_day:
-        daily_summary.append({
-            'Date': current_day,
-            'Start of Day Capital': start_of_day_capital,
-            'End of Day Capital': capital
-        })
+                missed_bars[n_missed] = i
+                missed_prices[n_missed] = price
+                missed_reasons[n_missed] = 1
+                n_missed += 1
+
+        # Sell Signal Logic: skipped unless some position can exit on this bar
+        if not npos or not (sell_signals[i] or price >= lowest_target or price <= highest_stop or after_square_off):
+            continue
+
+        # Exiting positions are dropped by moving the survivors down in one pass
+        kept = 0
+        lowest_target = np.inf
+        highest_stop = -np.inf
+        for p in range(npos):
+            reason = -1
+            if sell_signals[i]:
+                reason = 1
+            elif price >= positions[p, 4]:
+                reason = 2
+            elif price <= positions[p, 5]:
+                reason = 3
+            elif after_square_off:
+                reason = 4
+
+            if reason < 0:
+                positions[kept] = positions[p]
+                if positions[kept, 4] < lowest_target:
+                    lowest_target = positions[kept, 4]
+                if positions[kept, 5] > highest_stop:
+                    highest_stop = positions[kept, 5]
+                kept += 1
+                continue
+
+            shares_to_sell = positions[p, 0]
+            sell_charges = _transaction_charges(price, shares_to_sell, rates[1])
+            sell_revenue = shares_to_sell * price - sell_charges[0]
+            cost = shares_to_sell * positions[p, 1] + positions[p, 2]  # Include buy charges
+            profit_loss = sell_revenue - cost  # Deduct buy cost from sell revenue
+
+            capital += profit_loss
+            free_cash += positions[p, 3] + sell_revenue  # Replenish free cash (margin + revenue)
+
+            _record_trade(trades, n_trades, i, 1, reason, price, shares_to_sell, profit_loss, sell_charges)
+            n_trades += 1
+        npos = kept
+
+    # Close the last day's summary
+    if n_days:
+        end_of_day_capitals[n_days - 1] = capital
+
+    trades = (trades[0][:n_trades], trades[1][:n_trades], trades[2][:n_trades], trades[3][:n_trades],
+              trades[4][:n_trades], trades[5][:n_trades], trades[6][:, :n_trades])
+    missed = (missed_bars[:n_missed], missed_prices[:n_missed], missed_reasons[:n_missed])
+    daily = (summary_days[:n_days], start_of_day_capitals[:n_days], end_of_day_capitals[:n_days])
+    return trades, missed, daily
+
+def simulate_trades(data, initial_capital, trade_allocation, leverage, target_profit_percentage, atr_multiplier, charges_config, indicator_config, historical_data):
+    """
+    Simulate trades based on generated signals, calculate profits/losses, and record trades.
+    
+    Parameters:
+        data (pd.DataFrame): Data containing price and indicator information.
+        initial_capital (float): Starting capital for trading.
+        trade_allocation (float): Fraction of capital to allocate per trade.
+        leverage (int): Leverage factor.
+        target_profit_percentage (float): Percentage at which to take profit.
+        atr_multiplier (float): Multiplier for ATR to set stop-loss.
+        charges_config (dict): Configuration for transaction charges.
+        indicator_config (dict): Configuration for indicators like RSI period.
+        historical_data (dict): Historical data configurations (e.g., interval, dates).
+    
+    Returns:
+        trades_df (pd.DataFrame): DataFrame containing all executed trades.
+        missed_signals_df (pd.DataFrame): DataFrame containing all missed signals.
+        daily_summary_df (pd.DataFrame): DataFrame containing daily capital summaries.
+        final_summary (dict): Dictionary containing overall performance metrics.
+    """
+    # Unpack historical_data and indicator_config for use within the function
+    FROM_DATE = historical_data.get('fromdate', 'N/A')
+    TO_DATE = historical_data.get('todate', 'N/A')
+    INTERVAL = historical_data.get('interval', 'N/A')
+    SYMBOL_TOKEN = historical_data.get('symboltoken', 'N/A')
+    RSI_PERIOD = indicator_config.get('RSI_PERIOD', 'N/A')
+    MACD_FAST = indicator_config.get('MACD_FAST', 'N/A')
+    MACD_SLOW = indicator_config.get('MACD_SLOW', 'N/A')
+    MACD_SIGNAL = indicator_config.get('MACD_SIGNAL', 'N/A')
+    ATR_PERIOD = indicator_config.get('ATR_PERIOD', 'N/A')
+    ATR_THRESHOLD = indicator_config.get('ATR_THRESHOLD', 'N/A')
+
+    # Pull the columns the simulation needs out as NumPy arrays
+    timestamps = data['timestamp'].to_numpy(dtype='datetime64[ns]')
+    prices = np.ascontiguousarray(data['close'].to_numpy(dtype=np.float64))
+    atrs = np.ascontiguousarray(data['ATR'].to_numpy(dtype=np.float64))
+    buy_signals = data['Buy_Signal'].to_numpy(dtype=bool)
+    sell_signals = data['Sell_Signal'].to_numpy(dtype=bool)
+
+    # Trading days as days since the epoch, and the position of each bar's day among them
+    days, day_index = np.unique(timestamps.astype('datetime64[D]').view(np.int64), return_inverse=True)
+
+    trades, missed, daily = _simulate_core(
+        timestamps.view(np.int64), prices, atrs, buy_signals, sell_signals, days, day_index,
+        charges_array(charges_config), float(initial_capital), float(trade_allocation), float(leverage),
+        float(target_profit_percentage), float(atr_multiplier)
+    )
+    trade_bars, trade_types, trade_reasons, trade_prices, trade_shares, trade_profit_loss, trade_charges = trades
+
+    # Totals are reductions over the trade columns; only Sell exits count towards revenue
+    buys = trade_types == BUY
+    sells = trade_types == SELL
+    trade_values = trade_shares * trade_prices
+    total_profit_loss = trade_profit_loss.sum()
+    total_revenue = (trade_values[sells] - trade_charges[0][sells]).sum()
+    total_cost = (trade_values[buys] + trade_charges[0][buys]).sum()
+    current_stock_holding = int(trade_shares[buys].sum() - trade_shares[~buys].sum())
 
     # Calculate the final capital
     final_capital = initial_capital + total_profit_loss
-    current_stock_holding = sum(pos['shares'] for pos in long_positions)
 
-    # Create DataFrames for results
-    trades_df = pd.DataFrame(trades, columns=['Time', 'Type', 'Reason', 'Price', 'Shares', 'Profit/Loss', 'Charges',
-                                              'Brokerage', 'STT', 'Transaction Charge', 'SEBI Charge', 'GST',
-                                              'Stamp Duty'])
-    missed_signals_df = pd.DataFrame(missed_signals, columns=['Time', 'Price', 'Reason'])
-    daily_summary_df = pd.DataFrame(daily_summary)
+    # Create DataFrames for results straight from the column arrays
+    trades_df = pd.DataFrame({
+        'Time': timestamps[trade_bars],
+        'Type': TRADE_TYPES[trade_types],
+        'Reason': TRADE_REASONS[trade_reasons],
+        'Price': trade_prices,
+        'Shares': trade_shares,
+        'Profit/Loss': trade_profit_loss,
+        'Charges': trade_charges[0],
+        'Brokerage': trade_charges[1],
+        'STT': trade_charges[2],
+        'Transaction Charge': trade_charges[3],
+        'SEBI Charge': trade_charges[4],
+        'GST': trade_charges[5],
+        'Stamp Duty': trade_charges[6]
+    })
+
+    missed_bars, missed_prices, missed_reasons = missed
+    missed_signals_df = pd.DataFrame({
+        'Time': timestamps[missed_bars],
+        'Price': missed_prices,
+        'Reason': MISSED_REASONS[missed_reasons]
+    })
+
+    summary_days, start_of_day_capitals, end_of_day_capitals = daily
+    daily_summary_df = pd.DataFrame({
+        'Date': summary_days.astype('datetime64[D]').astype(object),
+        'Start of Day Capital': start_of_day_capitals,
+        'End of Day Capital': end_of_day_capitals
+    })
 
     # Create the final_summary dictionary
     final_summary = {
@@ -241,14 +370,14 @@ def simulate_trades(data, initial_capital, trade_allocation, leverage, target_pr
         'Initial Capital': initial_capital,
         'Current Stock Holding': current_stock_holding,
         'Leverage Used': leverage,
-        'RSI_PERIOD': indicator_config.get('RSI_PERIOD', 'N/A'),
-        'MACD_FAST': indicator_config.get('MACD_FAST', 'N/A'),
-        'MACD_SLOW': indicator_config.get('MACD_SLOW', 'N/A'),
-        'MACD_SIGNAL': indicator_config.get('MACD_SIGNAL', 'N/A'),
-        'ATR_PERIOD': indicator_config.get('ATR_PERIOD', 'N/A'),
-        'ATR_THRESHOLD': indicator_config.get('ATR_THRESHOLD', 'N/A'),
-        'INTERVAL': historical_data.get('interval', 'N/A'),
-        'SYMBOL_TOKEN': historical_data.get('symboltoken', 'N/A'),
+        'RSI_PERIOD': RSI_PERIOD,
+        'MACD_FAST': MACD_FAST,
+        'MACD_SLOW': MACD_SLOW,
+        'MACD_SIGNAL': MACD_SIGNAL,
+        'ATR_PERIOD': ATR_PERIOD,
+        'ATR_THRESHOLD': ATR_THRESHOLD,
+        'INTERVAL': INTERVAL,
+        'SYMBOL_TOKEN': SYMBOL_TOKEN,
         'FROM_DATE': FROM_DATE,
         'TO_DATE': TO_DATE,
         'TRADE_ALLOCATION': trade_allocation,
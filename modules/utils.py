@@ -1,9 +1,6 @@
 # modules/utils.py
 
 import logging
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Alignment
-from openpyxl import load_workbook
 import pandas as pd  # Add this import
 
 def setup_logging(log_file='logs/trading_bot.log', level=logging.INFO):
@@ -17,43 +14,24 @@ def setup_logging(log_file='logs/trading_bot.log', level=logging.INFO):
         ]
     )
 
-def center_align_and_autofit_excel(file_path):
-    """
-    Centers all content in all sheets of the Excel file both horizontally and vertically,
-    and adjusts column widths to fit the content.
-    """
-    # Load the workbook
-    workbook = load_workbook(file_path)
-
-    # Iterate over all sheets
-    for sheet in workbook.sheetnames:
-        ws = workbook[sheet]
-
-        # Dictionary to track the maximum width needed for each column
-        column_widths = {}
-
-        # Iterate over all rows and columns
-        for row in ws.iter_rows(min_row=1, max_row=ws.max_row, min_col=1, max_col=ws.max_column):
-            for cell in row:
-                # Apply alignment to each cell
-                cell.alignment = Alignment(horizontal='center', vertical='center')
+def is_timezone_aware(dtype):
+    """Whether dtype holds timezone-aware datetimes, either NumPy- or pyarrow-backed."""
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return True
+    return isinstance(dtype, pd.ArrowDtype) and getattr(dtype.pyarrow_dtype, 'tz', None) is not None
 
-                # Calculate the maximum width for each column
-                if cell.value is not None:
-                    cell_length = len(str(cell.value))
-                    column_letter = get_column_letter(cell.column)
-                    if column_letter not in column_widths:
-                        column_widths[column_letter] = cell_length
-                    else:
-                        column_widths[column_letter] = max(column_widths[column_letter], cell_length)
-
-        # Adjust the width of each column based on the maximum content length
-        for column_letter, width in column_widths.items():
-            ws.column_dimensions[column_letter].width = width + 2  # Add some padding for readability
+def strip_timezone(series):
+    """
+    Drops the timezone of a timezone-aware datetime Series, keeping its local wall times.
 
-    # Save the updated workbook
-    workbook.save(file_path)
-    logging.info(f"Content successfully centered, middle-aligned, and columns auto-fitted in all sheets of {file_path}")
+    tz_localize(None) on pyarrow timestamps returns the UTC wall times instead, so those
+    go through the NumPy datetime dtype and are cast back to pyarrow afterwards.
+    """
+    if isinstance(series.dtype, pd.ArrowDtype):
+        arrow_type = series.dtype.pyarrow_dtype
+        local = series.astype(pd.DatetimeTZDtype(arrow_type.unit, arrow_type.tz)).dt.tz_localize(None)
+        return local.astype(f"timestamp[{arrow_type.unit}][pyarrow]")
+    return series.dt.tz_localize(None)
 
 def remove_timezone(df):
     """
@@ -65,11 +43,13 @@ def remove_timezone(df):
     Returns:
         pd.DataFrame: The processed DataFrame with timezone-naive datetime columns.
     """
-    for col in df.columns:
-        if pd.api.types.is_datetime64_any_dtype(df[col]):
-            # Check if the datetime column is timezone-aware
-            if df[col].dt.tz is not None:
-                df[col] = df[col].dt.tz_localize(None)
+    # Usually there is nothing to convert, which the dtypes alone tell
+    timezone_aware = [col for col, dtype in df.dtypes.items() if is_timezone_aware(dtype)]
+    if not timezone_aware:
+        return df
+
+    # Replace the timezone-aware columns in one assignment instead of one column at a time
+    df[timezone_aware] = pd.concat({col: strip_timezone(df[col]) for col in timezone_aware}, axis=1)
     return df
 
 def assert_timezone_naive(df, df_name):
@@ -81,9 +61,9 @@ def assert_timezone_naive(df, df_name):
         df_name (str): Name of the DataFrame for logging purposes.
 
     Raises:
-        ValueError: If any datetime column is timezone-aware.
+        ValueError: If any datetime column is timezone-aware, naming all of them.
     """
-    for col in df.columns:
-        if pd.api.types.is_datetime64_any_dtype(df[col]):
-            if df[col].dt.tz is not None:
-                raise ValueError(f"Column '{col}' in DataFrame '{df_name}' is timezone-aware.")
+    # Usually every column is timezone-naive, which the dtypes alone tell
+    timezone_aware = [col for col, dtype in df.dtypes.items() if is_timezone_aware(dtype)]
+    if timezone_aware:
+        raise ValueError(f"Columns {timezone_aware} in DataFrame '{df_name}' are timezone-aware.")